@@ -1,11 +1,20 @@
+import atexit
+import csv
+import glob
+import hashlib
+import io
 import os
+import shutil
 import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 
+import numpy as np
+import openpyxl
 import pandas as pd
 import streamlit as st
 
-from maps_extractor import GoogleMapsExtractor
+from maps_extractor import GoogleMapsExtractor, add_search_columns, read_table
 
 # Page configuration
 st.set_page_config(
@@ -15,9 +24,12 @@ st.set_page_config(
 )
 
 CACHE_DIR = os.getcwd()
+REQUIRED_COLS = ['ID', 'Customer Code', 'Display Partner', 'Email', 'Phone', 'Mobile', 'Street', 'Street2', 'City', 'State', 'Zip', 'Country']
+PREVIEW_ROWS = 10
+IO_CHUNK_SIZE = 1 << 20
+WORK_EXTENSION = 'parquet'
 
-# Custom CSS
-st.markdown("""
+STYLE_BLOCK = """
     <style>
     :root {
         --accent: #1e88e5;
@@ -92,11 +104,154 @@ st.markdown("""
         border: 2px solid #667eea;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+HEADER_HTML = (
+    '<h1 class="main-header">🗺️ Google Maps Address Extractor</h1>'
+    '<p class="subhead">Upload, dedupe by search query, and standardize addresses via Google Maps</p>'
+)
+
+
+@contextmanager
+def styled_box(css_class):
+    """Wrap the enclosed elements' output in one of the STYLE_BLOCK box classes."""
+    st.markdown(f'<div class="{css_class}">', unsafe_allow_html=True)
+    yield
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+def read_upload(source, extension, **kwargs):
+    """Read an uploaded CSV or Excel file, using openpyxl for .xlsx."""
+    if extension == 'csv':
+        return pd.read_csv(source, **kwargs)
+    if extension == 'xlsx':
+        kwargs.setdefault('engine', 'openpyxl')
+    return pd.read_excel(source, **kwargs)
+
+
+def read_upload_header(source, extension):
+    """Return the column names of an upload without parsing any data rows."""
+    if extension == 'csv':
+        text = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+        try:
+            return next(csv.reader(text), [])
+        finally:
+            text.detach()
+    if extension == 'xlsx':
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
+            # The first sheet, like read_upload and process_file -- not whichever tab was left active
+            first_row = next(workbook.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+            return [value for value in first_row if value is not None]
+        finally:
+            workbook.close()
+    return read_upload(source, extension, nrows=0).columns.tolist()
+
+
+@st.cache_data(show_spinner=False)
+def load_upload_header(content_hash, extension, _file):
+    """Return (columns, missing required columns) for an upload; cached per content hash."""
+    try:
+        _file.seek(0)
+        columns = read_upload_header(_file, extension)
+        return columns, [col for col in REQUIRED_COLS if col not in columns]
+    finally:
+        _file.seek(0)
+
+
+@st.cache_data(show_spinner=False)
+def load_upload_preview(content_hash, extension, _file):
+    """Parse only what the preview needs: first rows of the required columns and the row count.
+
+    Cached per content hash so widget reruns don't re-parse the upload.
+    """
+    try:
+        _file.seek(0)
+        preview = add_search_columns(read_upload(_file, extension, usecols=REQUIRED_COLS, nrows=PREVIEW_ROWS, dtype=str))
+        _file.seek(0)
+        row_count = len(read_upload(_file, extension, usecols=['ID']))
+        return preview, row_count
+    finally:
+        _file.seek(0)
+
+
+@st.cache_data(show_spinner=False)
+def upload_digest(file_id, _file):
+    """Short content hash of an upload, streamed in 1 MiB chunks; cached per upload."""
+    digest = hashlib.blake2b(digest_size=8)
+    _file.seek(0)
+    for chunk in iter(lambda: _file.read(IO_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    _file.seek(0)
+    return digest.hexdigest()
+
+
+def find_work_path(base_name, content_hash):
+    """Reuse any working copy of the same contents (even if the upload was renamed)."""
+    existing = glob.glob(os.path.join(glob.escape(CACHE_DIR), f"*.{content_hash}_working.{WORK_EXTENSION}"))
+    if existing:
+        return existing[0]
+    return os.path.join(CACHE_DIR, f"{base_name}.{content_hash}_working.{WORK_EXTENSION}")
+
+
+@st.cache_data(show_spinner=False)
+def load_working(path, mtime):
+    """Read the working copy; `mtime` is only a cache key so new batch writes invalidate it."""
+    return read_table(path)
+
+
+@st.cache_data(show_spinner=False)
+def load_progress(path, mtime):
+    """Return (completed, remaining) by reading only the working copy's `processed` column."""
+    # process_file writes `processed` into every working copy it creates
+    processed = pd.read_parquet(path, columns=['processed'])['processed']
+    completed = int(processed.to_numpy(dtype=bool).sum())
+    return completed, len(processed) - completed
+
+
+def get_extractor(headless, sleep_range, google_api_key=None):
+    """Return this session's extractor, relaunching Chrome only when the window mode changes."""
+    extractor = st.session_state.get('extractor')
+    if extractor is None or st.session_state.get('extractor_key') != headless:
+        if extractor is not None:
+            # Release the old extractor entirely so its exit hook doesn't keep it alive
+            atexit.unregister(extractor.quit)
+            extractor.quit()
+        extractor = GoogleMapsExtractor(headless=headless, sleep_range=sleep_range, google_api_key=google_api_key)
+        atexit.register(extractor.quit)
+        st.session_state.extractor = extractor
+        st.session_state.extractor_key = headless
+    else:
+        extractor.set_sleep_range(sleep_range)
+        if extractor.google_api_key != (google_api_key or None):
+            extractor.set_api_key(google_api_key)
+    return extractor
 
-# Header
-st.markdown('<h1 class="main-header">🗺️ Google Maps Address Extractor</h1>', unsafe_allow_html=True)
-st.markdown('<p class="subhead">Upload, dedupe by search query, and standardize addresses via Google Maps</p>', unsafe_allow_html=True)
+
+def working_key(path):
+    """Cache key for the working copy at `path`, or None when it does not exist."""
+    if not os.path.exists(path):
+        return None
+    return path, os.path.getmtime(path)
+
+
+@st.cache_data(show_spinner=False)
+def to_excel_bytes(_df, cache_key):
+    # xlsxwriter streams cells to the zip instead of building an openpyxl workbook model.
+    # constant_memory is not used: pandas writes column by column and that mode needs row order.
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        _df.to_excel(writer, index=False, sheet_name='data')
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(_df, cache_key):
+    return _df.to_csv(index=False).encode('utf-8')
+
+
+# Custom CSS and header
+st.markdown(STYLE_BLOCK + HEADER_HTML, unsafe_allow_html=True)
 
 # Information section
 with st.expander("ℹ️ How to Use This Tool", expanded=False):
@@ -106,14 +261,15 @@ with st.expander("ℹ️ How to Use This Tool", expanded=False):
     2. We create `street_` (Street or Street2) and build the search query as:
        - `<Display Partner> in <street_> <City> <State> <Zip>` when Display Partner exists
        - `<street_> <City> <State> <Zip>` otherwise
-    3. Choose headless/non-headless Chrome, set the random delay (2–10s), and pick batch size (5–20 rows per batch).
+    3. Choose headless/non-headless Chrome, set the starting delay (1–4s, adapted as lookups succeed or get throttled), and pick batch size (5–20 rows per batch).
     4. Click **Start Processing** to scrape Google Maps for the first address element.
     5. Download the output with new columns: `street_`, `search_query`, `standard_address`.
     
     ### Notes:
     - Uses undetected Chrome + human-like pauses to reduce captchas; headless optional; forces English locale for Maps.
     - Leaves `street_` blank if both Street and Street2 are blank; `standard_address` is `N/A` when not found.
-    - A working copy named `<original>_working.<ext>` is saved in this folder and updated after each batch; on re-uploading the same file name, processing resumes from already-processed rows (even if they were `N/A`). Use **Clear saved progress** to reset.
+    - A working copy named `<original>.<hash>_working.parquet` is saved in this folder and updated after each batch; on re-uploading the same file contents (even under another name), processing resumes from already-processed rows (even if they were `N/A`). Use **Clear saved progress** to reset.
+    - The Chrome window is kept open between runs to skip start-up time; use **Restart browser** to close it.
     - Chrome must be installed locally.
     """)
 
@@ -133,104 +289,95 @@ for key, default in [
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    st.markdown('<div class="info-box">', unsafe_allow_html=True)
-    st.subheader("📁 Upload Your File")
-    uploaded_file = st.file_uploader(
-        "Choose a CSV or Excel file",
-        type=['csv', 'xlsx', 'xls'],
-        help="Upload a file containing Street/Street2/City/State/Zip/Display Partner"
-    )
-    st.markdown('</div>', unsafe_allow_html=True)
+    with styled_box("info-box"):
+        st.subheader("📁 Upload Your File")
+        uploaded_file = st.file_uploader(
+            "Choose a CSV or Excel file",
+            type=['csv', 'xlsx', 'xls'],
+            help="Upload a file containing Street/Street2/City/State/Zip/Display Partner"
+        )
 
 with col2:
-    st.markdown('<div class="info-box">', unsafe_allow_html=True)
-    st.subheader("📊 File Information")
-    headless_mode = st.toggle("Hide Chrome window", value=True, help="Run Chrome off-screen (no visible browser window)")
-    delay_seconds = st.slider(
-        "Delay between lookups (seconds)",
-        min_value=1.0,
-        max_value=4.0,
-        value=2.0,
-        step=0.5,
-        help="Pause between lookups; higher is safer (jitter ±0.5s applied)"
-    )
-    batch_size = st.slider(
-        "Batch size",
-        min_value=5,
-        max_value=50,
-        value=20,
-        step=5,
-        help="Process rows in batches; progress is saved after each batch"
-    )
-    st.session_state.batch_size = batch_size
-    st.caption(f"Using delay: {delay_seconds:.1f}s | Batch size: {batch_size}")
-    if uploaded_file:
-        st.write(f"**Filename:** {uploaded_file.name}")
-        st.write(f"**Size:** {uploaded_file.size / 1024:.2f} KB")
-        file_extension = uploaded_file.name.split('.')[-1]
-        st.write(f"**Type:** {file_extension.upper()}")
-    else:
-        st.write("No file uploaded yet")
-    st.markdown('</div>', unsafe_allow_html=True)
+    with styled_box("info-box"):
+        st.subheader("📊 File Information")
+        headless_mode = st.toggle("Hide Chrome window", value=True, help="Run Chrome off-screen (no visible browser window)")
+        delay_seconds = st.slider(
+            "Delay between lookups (seconds)",
+            min_value=1.0,
+            max_value=4.0,
+            value=2.0,
+            step=0.5,
+            help="Starting pause between lookups; it shortens while addresses are found and backs off when Google pushes back"
+        )
+        batch_size = st.slider(
+            "Batch size",
+            min_value=5,
+            max_value=50,
+            value=20,
+            step=5,
+            help="Process rows in batches; progress is saved after each batch"
+        )
+        st.session_state.batch_size = batch_size
+        workers = st.slider(
+            "Parallel browsers",
+            min_value=1,
+            max_value=4,
+            value=1,
+            help="Run this many Chrome windows at once; more is faster but reaches Google's rate limit sooner"
+        )
+        google_api_key = st.text_input(
+            "Google Geocoding API key (optional)",
+            value=os.environ.get("GOOGLE_MAPS_API_KEY", ""),
+            type="password",
+            help="When set, each address is tried against the Geocoding API first; Chrome handles only the misses"
+        )
+        st.caption(f"Using delay: {delay_seconds:.1f}s | Batch size: {batch_size} | Browsers: {workers}")
+        if uploaded_file:
+            st.write(f"**Filename:** {uploaded_file.name}")
+            st.write(f"**Size:** {uploaded_file.size / 1024:.2f} KB")
+            file_extension = uploaded_file.name.split('.')[-1]
+            st.write(f"**Type:** {file_extension.upper()}")
+        else:
+            st.write("No file uploaded yet")
 
 # Preview uploaded file
 if uploaded_file:
     try:
-        # Read the file
-        if uploaded_file.name.endswith('.csv'):
-            df_preview = pd.read_csv(uploaded_file)
-        else:
-            df_preview = pd.read_excel(uploaded_file)
-        
-        # Reset file pointer
-        uploaded_file.seek(0)
-
         # Prepare cache paths
-        extension = uploaded_file.name.rsplit('.', 1)[-1]
+        extension = uploaded_file.name.rsplit('.', 1)[-1].lower()
         base_name = uploaded_file.name.rsplit('.', 1)[0]
-        work_filename = f"{base_name}_working.{extension}"
-        work_path = os.path.join(CACHE_DIR, work_filename)
+        content_hash = upload_digest(uploaded_file.file_id, uploaded_file)
+        columns, missing = load_upload_header(content_hash, extension, uploaded_file)
+        work_path = find_work_path(base_name, content_hash)
         st.session_state.work_path = work_path
         st.session_state.output_extension = extension
         
         # Check required columns exist
-        required_cols = ['ID', 'Customer Code', 'Display Partner', 'Email', 'Phone', 'Mobile', 'Street', 'Street2', 'City', 'State', 'Zip', 'Country']
-        missing = [col for col in required_cols if col not in df_preview.columns]
         if missing:
-            st.markdown('<div class="error-box">', unsafe_allow_html=True)
-            st.error("❌ Error: The uploaded file is missing required columns.")
-            st.markdown('</div>', unsafe_allow_html=True)
+            with styled_box("error-box"):
+                st.error("❌ Error: The uploaded file is missing required columns.")
             st.info("**Missing:** " + ", ".join(missing))
-            st.info("**Available columns:** " + ", ".join(df_preview.columns.tolist()))
+            st.info("**Available columns:** " + ", ".join(map(str, columns)))
         else:
-            st.markdown('<div class="success-box">', unsafe_allow_html=True)
-            st.success(f"✅ File validated successfully! Found {len(df_preview)} rows to process.")
-            st.markdown('</div>', unsafe_allow_html=True)
+            df_preview, row_count = load_upload_preview(content_hash, extension, uploaded_file)
+
+            with styled_box("success-box"):
+                st.success(f"✅ File validated successfully! Found {row_count} rows to process.")
 
             st.info(f"Working copy will be stored at: `{work_path}` (used for resume)")
 
-            if os.path.exists(work_path):
+            work_key = working_key(work_path)
+            if work_key is not None:
                 try:
-                    if extension == 'csv':
-                        df_existing = pd.read_csv(work_path)
-                    else:
-                        df_existing = pd.read_excel(work_path)
-                    processed_col = df_existing.get('processed')
-                    if processed_col is not None:
-                        processed_mask = processed_col.astype(bool)
-                        completed = processed_mask.sum()
-                        remaining = len(df_existing) - completed
-                    else:
-                        remaining = (df_existing['standard_address'].astype(str).str.strip().fillna("N/A") == "N/A").sum()
-                        completed = len(df_existing) - remaining
+                    completed, remaining = load_progress(*work_key)
                     st.info(f"📂 Found saved progress in working copy: {completed} done, {remaining} remaining. Resume will continue from that file.")
                 except Exception:
                     st.warning("⚠️ Found saved file but could not read it; a new working copy will be created on start.")
             
             # Show preview
             st.subheader("📋 Data Preview")
-            st.dataframe(df_preview.head(10), width='stretch')
-            st.caption(f"Showing first 10 rows of {len(df_preview)} total rows")
+            st.dataframe(df_preview, width='stretch')
+            st.caption(f"Showing first {len(df_preview)} rows of {row_count} total rows")
             
             # Processing section
             st.markdown("---")
@@ -263,89 +410,93 @@ if uploaded_file:
                     except Exception as e:
                         st.error(f"Could not clear saved progress: {e}")
             
+            with col_btn3:
+                restart_browser = st.button(
+                    "🔄 Restart browser",
+                    disabled=st.session_state.get('extractor') is None or st.session_state.processing,
+                    help="Close the reused Chrome window; a fresh one starts with the next run"
+                )
+                if restart_browser:
+                    st.session_state.extractor.quit()
+                    st.success("Browser closed.")
+            
             # Download section - Show if working file exists OR processing is complete
             if os.path.exists(work_path) or st.session_state.processed_df is not None:
                 st.markdown("---")
-                st.markdown('<div class="download-section">', unsafe_allow_html=True)
-                st.subheader("📥 Download Results")
+                with styled_box("download-section"):
+                    st.subheader("📥 Download Results")
                 
-                # Try to load the latest data
-                try:
-                    if st.session_state.processed_df is not None:
-                        current_df = st.session_state.processed_df
-                    elif os.path.exists(work_path):
-                        if extension == 'csv':
-                            current_df = pd.read_csv(work_path)
+                    # Try to load the latest data
+                    try:
+                        work_key = working_key(work_path)
+                        if work_key is not None:
+                            current_df = load_working(*work_key)
+                            cache_key = work_key
+                        elif st.session_state.processed_df is not None:
+                            current_df = st.session_state.processed_df
+                            cache_key = (None, id(current_df))
                         else:
-                            current_df = pd.read_excel(work_path)
-                    else:
-                        current_df = None
+                            current_df = None
                     
-                    if current_df is not None:
-                        # Show statistics
-                        total = len(current_df)
-                        if 'standard_address' in current_df.columns:
-                            found = len(current_df[current_df['standard_address'] != 'N/A'])
-                            not_found = total - found
-                            processed_col = current_df.get('processed')
-                            if processed_col is not None:
-                                actually_processed = processed_col.astype(bool).sum()
+                        if current_df is not None:
+                            # Show statistics
+                            total = len(current_df)
+                            if 'standard_address' in current_df.columns:
+                                standard_address = current_df['standard_address'].to_numpy()
+                                found = int(np.not_equal(standard_address, 'N/A').sum())
+                                not_found = total - found
+                                processed_col = current_df.get('processed')
+                                if processed_col is not None:
+                                    actually_processed = int(processed_col.to_numpy(dtype=bool).sum())
+                                else:
+                                    actually_processed = found + not_found
                             else:
-                                actually_processed = found + not_found
-                        else:
-                            found = 0
-                            not_found = 0
-                            actually_processed = 0
+                                found = 0
+                                not_found = 0
+                                actually_processed = 0
                         
-                        col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
-                        col_stat1.metric("Total Rows", total)
-                        col_stat2.metric("Processed", actually_processed)
-                        col_stat3.metric("✅ Found", found)
-                        col_stat4.metric("❌ Not Found", not_found)
+                            col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
+                            col_stat1.metric("Total Rows", total)
+                            col_stat2.metric("Processed", actually_processed)
+                            col_stat3.metric("✅ Found", found)
+                            col_stat4.metric("❌ Not Found", not_found)
                         
-                        # Download buttons
-                        st.markdown("### Choose Download Format:")
-                        col_dl1, col_dl2 = st.columns(2)
+                            # Download buttons
+                            st.markdown("### Choose Download Format:")
+                            col_dl1, col_dl2 = st.columns(2)
                         
-                        # Generate filenames
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        excel_filename = f"{base_name}_standardized_{timestamp}.xlsx"
-                        csv_filename = f"{base_name}_standardized_{timestamp}.csv"
+                            # Generate filenames
+                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                            excel_filename = f"{base_name}_standardized_{timestamp}.xlsx"
+                            csv_filename = f"{base_name}_standardized_{timestamp}.csv"
                         
-                        with col_dl1:
-                            # Excel download
-                            from io import BytesIO
-                            excel_buffer = BytesIO()
-                            current_df.to_excel(excel_buffer, index=False, engine='openpyxl')
-                            excel_data = excel_buffer.getvalue()
-                            
-                            st.download_button(
-                                label="📊 Download as Excel (.xlsx)",
-                                data=excel_data,
-                                file_name=excel_filename,
-                                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                                width='stretch',
-                                type="primary"
-                            )
+                            # Both files are generated only when their button is clicked (and cached per version)
+                            with col_dl1:
+                                # Excel download
+                                st.download_button(
+                                    label="📊 Download as Excel (.xlsx)",
+                                    data=lambda df=current_df, key=cache_key: to_excel_bytes(df, key),
+                                    file_name=excel_filename,
+                                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                                    width='stretch',
+                                    type="primary"
+                                )
                         
-                        with col_dl2:
-                            # CSV download
-                            csv_data = current_df.to_csv(index=False).encode('utf-8')
-                            
-                            st.download_button(
-                                label="📄 Download as CSV (.csv)",
-                                data=csv_data,
-                                file_name=csv_filename,
-                                mime='text/csv',
-                                width='stretch'
-                            )
+                            with col_dl2:
+                                # CSV download
+                                st.download_button(
+                                    label="📄 Download as CSV (.csv)",
+                                    data=lambda df=current_df, key=cache_key: to_csv_bytes(df, key),
+                                    file_name=csv_filename,
+                                    mime='text/csv',
+                                    width='stretch'
+                                )
                         
-                        st.info("💡 **Tip:** Download anytime to save your progress, even if processing isn't complete!")
+                            st.info("💡 **Tip:** Download anytime to save your progress, even if processing isn't complete!")
                         
-                except Exception as e:
-                    st.error(f"Error preparing download: {e}")
+                    except Exception as e:
+                        st.error(f"Error preparing download: {e}")
                 
-                st.markdown('</div>', unsafe_allow_html=True)
             
             # Processing logic
             if start_button:
@@ -363,36 +514,44 @@ if uploaded_file:
                 try:
                     status_text.text("🔧 Initializing Chrome driver...")
                     resume_run = os.path.exists(work_path)
+                    upload_path = None
                     if not resume_run:
-                        with open(work_path, "wb") as f:
-                            f.write(uploaded_file.getvalue())
+                        # The extractor reads the original upload once and writes the Parquet working copy
+                        with tempfile.NamedTemporaryFile(suffix=f".{extension.lower()}", dir=CACHE_DIR, delete=False) as f:
+                            uploaded_file.seek(0)
+                            shutil.copyfileobj(uploaded_file, f, length=IO_CHUNK_SIZE)
+                            upload_path = f.name
                         status_text.text("📄 Created working copy...")
                     
-                    extractor = GoogleMapsExtractor(
+                    extractor = get_extractor(
                         headless=headless_mode,
-                        sleep_range=(delay_seconds - 0.5, delay_seconds + 0.5)
-                    )
-                    success, result = extractor.process_file(
-                        input_file=work_path,
-                        output_file=work_path,
-                        progress_callback=update_progress,
-                        resume=resume_run,
-                        batch_size=st.session_state.batch_size
+                        sleep_range=(delay_seconds - 0.5, delay_seconds + 0.5),
+                        google_api_key=google_api_key.strip() or None
                     )
+                    try:
+                        success, result = extractor.process_file(
+                            input_file=upload_path or work_path,
+                            output_file=work_path,
+                            progress_callback=update_progress,
+                            resume=resume_run,
+                            batch_size=st.session_state.batch_size,
+                            keep_driver=True,
+                            workers=workers,
+                            cache_path=os.path.join(CACHE_DIR, "maps_cache.sqlite")
+                        )
+                    finally:
+                        if upload_path and os.path.exists(upload_path):
+                            os.unlink(upload_path)
                     
                     if success:
                         # Read the processed file
-                        if extension == 'csv':
-                            st.session_state.processed_df = pd.read_csv(work_path)
-                        else:
-                            st.session_state.processed_df = pd.read_excel(work_path)
+                        st.session_state.processed_df = load_working(*working_key(work_path))
                         
                         status_text.empty()
                         progress_bar.empty()
                         
-                        st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                        st.success("✅ Processing completed successfully!")
-                        st.markdown('</div>', unsafe_allow_html=True)
+                        with styled_box("success-box"):
+                            st.success("✅ Processing completed successfully!")
                         
                         # Show results preview
                         st.subheader("📊 Results Preview")
@@ -404,24 +563,21 @@ if uploaded_file:
                     else:
                         status_text.empty()
                         progress_bar.empty()
-                        st.markdown('<div class="error-box">', unsafe_allow_html=True)
-                        st.error(f"❌ Error during processing: {result}")
-                        st.markdown('</div>', unsafe_allow_html=True)
+                        with styled_box("error-box"):
+                            st.error(f"❌ Error during processing: {result}")
                 
                 except Exception as e:
                     status_text.empty()
                     progress_bar.empty()
-                    st.markdown('<div class="error-box">', unsafe_allow_html=True)
-                    st.error(f"❌ An error occurred: {str(e)}")
-                    st.markdown('</div>', unsafe_allow_html=True)
+                    with styled_box("error-box"):
+                        st.error(f"❌ An error occurred: {str(e)}")
                 
                 finally:
                     st.session_state.processing = False
     
     except Exception as e:
-        st.markdown('<div class="error-box">', unsafe_allow_html=True)
-        st.error(f"❌ Error reading file: {str(e)}")
-        st.markdown('</div>', unsafe_allow_html=True)
+        with styled_box("error-box"):
+            st.error(f"❌ Error reading file: {str(e)}")
 
 # Footer
 st.markdown("---")
@@ -1,42 +1,196 @@
+import functools
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import orjson
 import pandas as pd
 import requests
-import time
+from requests.adapters import HTTPAdapter
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+MAX_WORKERS = 8
+MIN_INTERVAL = 1.0  # Nominatim usage policy: max 1 request per second
+REQUEST_TIMEOUT = 10
+MAX_THROTTLE_RETRIES = 3
+THROTTLE_STATUSES = (429, 503)
+MISS_TTL = 30 * 24 * 3600  # re-query addresses Nominatim could not find after 30 days
+
+# One keep-alive session for all workers, with a connection pool per worker
+_session = requests.Session()
+_session.headers.update({
+    'User-Agent': 'AddressGeocoder/1.0'  # Nominatim requires a user agent
+})
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+
+
+class NominatimLimiter:
+    """Shared request pacing for all worker threads.
+
+    Request starts are spaced `interval` seconds apart (plus a little jitter),
+    so a fast response lets the next request go out immediately instead of
+    sleeping a fixed amount. When the server throttles us (429/503) every
+    worker is paused for `Retry-After`, or an exponentially growing backoff.
+    """
+
+    def __init__(self, interval, jitter=0.05, max_backoff=60.0):
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._last = 0.0
+        self._backoff = 0.0
+        self._blocked_until = 0.0
+
+    def acquire(self):
+        """Block until this thread may send its request."""
+        with self._lock:
+            now = time.monotonic()
+            next_slot = max(now, self._last + self.interval + random.uniform(0, self.jitter), self._blocked_until)
+            self._last = next_slot
+        delay = next_slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_response(self, response):
+        """Record the outcome of a request; returns True when it was throttled and should be retried."""
+        with self._lock:
+            if response.status_code not in THROTTLE_STATUSES:
+                self._backoff = 0.0
+                return False
+
+            self._backoff = min(self.max_backoff, max(self.interval, 2 * self._backoff))
+            retry_after = response.headers.get('Retry-After', '')
+            wait = float(retry_after) if retry_after.isdigit() else self._backoff
+            self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+            print(f"Nominatim throttled us ({response.status_code}); pausing {wait:.0f}s")
+            return True
+
+
+_rate_limiter = NominatimLimiter(MIN_INTERVAL)
+
+
+class GeocodeCache:
+    """SQLite-backed store of geocoding results keyed by normalized address."""
+
+    def __init__(self, path, commit_every=100, miss_ttl=MISS_TTL):
+        self.path = path
+        self.commit_every = commit_every
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geo(addr TEXT PRIMARY KEY, lat REAL, lon REAL, checked_at INTEGER)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(geo)")]
+        if 'checked_at' not in columns:
+            self._conn.execute("ALTER TABLE geo ADD COLUMN checked_at INTEGER DEFAULT 0")
+        self._conn.commit()
+
+    def get(self, key):
+        """Return (hit, (lat, lon)) for a normalized address.
+
+        Known misses are hits too, until they are older than `miss_ttl` seconds.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lat, lon, checked_at FROM geo WHERE addr = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return False, (None, None)
+        lat, lon, checked_at = row
+        if lat is None and (checked_at or 0) < time.time() - self.miss_ttl:
+            return False, (None, None)
+        return True, (lat, lon)
+
+    def put(self, key, lat, lon):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geo(addr, lat, lon, checked_at) VALUES (?, ?, ?, ?)",
+                (key, lat, lon, int(time.time()))
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+_disk_cache = None
+
+
+def enable_disk_cache(path):
+    """Persist geocoding results to `path` so repeated or resumed runs skip the network."""
+    global _disk_cache
+    _disk_cache = GeocodeCache(path)
+    return _disk_cache
+
+
+def normalize_address(address):
+    return " ".join(str(address).lower().split())
+
+
+def _fetch_from_nominatim(address):
+    """Query Nominatim for one address; raises on HTTP/network errors."""
+    params = {
+        'q': address,
+        'format': 'json',
+        'limit': 1
+    }
+    
+    for _ in range(MAX_THROTTLE_RETRIES + 1):
+        _rate_limiter.acquire()
+        response = _session.get(NOMINATIM_URL, params=params, timeout=REQUEST_TIMEOUT)
+        if not _rate_limiter.on_response(response):
+            break
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    
+    if data and len(data) > 0:
+        lat = float(data[0]['lat'])
+        lon = float(data[0]['lon'])
+        return lat, lon
+    print(f"No results found for '{address}'")
+    return None, None
+
+
+@functools.lru_cache(maxsize=100_000)
+def _geocode_cached(norm_addr):
+    if _disk_cache is not None:
+        hit, coords = _disk_cache.get(norm_addr)
+        if hit:
+            return coords
+    
+    lat, lon = _fetch_from_nominatim(norm_addr)
+    if _disk_cache is not None:
+        _disk_cache.put(norm_addr, lat, lon)
+    return lat, lon
+
 
 def geocode_address(address):
     """
     Geocode an address using Nominatim (OpenStreetMap) API
     
+    Results are memoized in-process and, when enabled, in the on-disk cache.
+    Failed requests are not cached so they are retried on the next run.
+    
     Args:
         address: Street address to geocode
     
     Returns:
         tuple: (latitude, longitude) or (None, None) if failed
     """
-    base_url = "https://nominatim.openstreetmap.org/search"
-    
-    params = {
-        'q': address,
-        'format': 'json',
-        'limit': 1
-    }
-    
-    headers = {
-        'User-Agent': 'AddressGeocoder/1.0'  # Nominatim requires a user agent
-    }
-    
     try:
-        response = requests.get(base_url, params=params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data and len(data) > 0:
-            lat = float(data[0]['lat'])
-            lon = float(data[0]['lon'])
-            return lat, lon
-        else:
-            print(f"No results found for '{address}'")
-            return None, None
-            
+        return _geocode_cached(normalize_address(address))
     except Exception as e:
         print(f"Error geocoding '{address}': {str(e)}")
         return None, None
@@ -46,22 +200,29 @@ def main():
     input_file = "C:\\Users\\praba\\Downloads\\businesses_from_pdf.csv"  # Change this to your CSV filename
     df = pd.read_csv(input_file)
     
-    # Create new columns for latitude and longitude
-    df['Latitude'] = None
-    df['Longitude'] = None
+    # Cache lives next to the output, named like the app's `<original>_working.<ext>` copy
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    cache = enable_disk_cache(f"{base_name}_geocache.sqlite")
+    
+    addresses = df['Address'].tolist()
+    lats = [np.nan] * len(addresses)
+    lons = [np.nan] * len(addresses)
+    
+    # Geocode addresses concurrently; the shared rate limiter keeps us within Nominatim's policy
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(geocode_address, address): i for i, address in enumerate(addresses)}
+            for future in as_completed(futures):
+                i = futures[future]
+                lat, lon = future.result()
+                if lat is not None:
+                    lats[i], lons[i] = lat, lon
+                print(f"Geocoded: {addresses[i]}")
+    finally:
+        cache.close()
     
-    # Geocode each address
-    for idx, row in df.iterrows():
-        address = row['Address']
-        print(f"Geocoding: {address}")
-        
-        lat, lng = geocode_address(address)
-        
-        df.at[idx, 'Latitude'] = lat
-        df.at[idx, 'Longitude'] = lng
-        
-        # Add delay to respect Nominatim's usage policy (max 1 request per second)
-        time.sleep(1.5)
+    df['Latitude'] = np.asarray(lats, dtype=np.float64)
+    df['Longitude'] = np.asarray(lons, dtype=np.float64)
     
     # Save the results to a new CSV file
     output_file = 'businesses_with_coordinates.csv'
@@ -74,4 +235,4 @@ def main():
     print(f"Failed: {df['Latitude'].isna().sum()}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,58 +1,384 @@
 import logging
+import multiprocessing
+import multiprocessing.util
 import os
 import random
 import re
+import sqlite3
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from urllib.parse import quote
 
+import lxml.html
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import requests
 import undetected_chromedriver as uc
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+TABLE_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.parquet')
+PARENTHESES_RE = re.compile(r'\s*\([^)]*\)')
+WHITESPACE_RE = re.compile(r'\s+')
+QUERY_PUNCTUATION_RE = re.compile(r'[^a-z0-9 ]+')
+# ASCII: ZIPs are ASCII digits, and skipping Unicode digit classes makes the reject path ~2x faster
+ZIP_RE = re.compile(r'\b\d{5}(?:-\d{4})?\b', re.ASCII)
+STATE_RE = re.compile(r'\b[A-Z]{2}\b')
+CITY_STATE_RE = re.compile(r',\s*[A-Za-z\s]+,\s*[A-Z]{2}')
+
+ADDRESS_CACHE_PATH = ".maps_cache.sqlite"
+ADDRESS_CACHE_TTL = 30 * 24 * 3600
+GEOCODE_API_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+# Statuses after which the key will keep failing for this run
+GEOCODE_API_FATAL = ('OVER_DAILY_LIMIT', 'OVER_QUERY_LIMIT', 'REQUEST_DENIED')
+# Headers for fetching the Maps search page without a browser; Google serves a stripped page to unknown agents
+HTTP_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36'),
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+# A US street address ending in "ST 12345" as it appears inside the page's embedded JSON
+EMBEDDED_ADDRESS_RE = re.compile(r'"(\d[^"\\]{8,150}?, [A-Z]{2} \d{5}(?:-\d{4})?)(?:, USA)?"')
+
+
+def _text_column(series):
+    """Stringify a column, mapping missing values and literal 'nan' to ''."""
+    text = series.fillna('').astype(str).str.strip()
+    return text.mask(text.str.lower() == 'nan', '')
+
+
+def add_search_columns(df):
+    """Add `street_` and `search_query` to `df` in place using vectorized string ops.
+
+    `street_` is Street, falling back to Street2. The query is
+    `<street_> <City> <State> <Zip>` with parenthesised notes removed,
+    prefixed by `<Display Partner> in ` when a partner is present.
+    """
+    street = _text_column(df['Street'])
+    df['street_'] = street.where(street != '', _text_column(df['Street2']))
+
+    parts = [
+        _text_column(df[col]).str.replace(PARENTHESES_RE, '', regex=True)
+        for col in ['street_', 'City', 'State', 'Zip']
+    ]
+    body = parts[0].str.cat(parts[1:], sep=' ').str.replace(WHITESPACE_RE, ' ', regex=True).str.strip()
+
+    display_partner = _text_column(df['Display Partner'])
+    with_partner = (display_partner + ' in ' + body).str.strip()
+    df['search_query'] = with_partner.where(display_partner != '', body)
+    return df
+
+
+def normalize_query(query):
+    """Lower-case a search query, turn punctuation into spaces and collapse whitespace."""
+    return WHITESPACE_RE.sub(' ', QUERY_PUNCTUATION_RE.sub(' ', str(query).lower())).strip()
+
+
+def _normalize_queries(queries):
+    """`normalize_query` over a Series with vectorized string ops."""
+    return (queries.astype(str).str.lower()
+            .str.replace(QUERY_PUNCTUATION_RE, ' ', regex=True)
+            .str.replace(WHITESPACE_RE, ' ', regex=True)
+            .str.strip())
+
+
+def is_searchable_query(query):
+    """Cheap check that a query could be an address before spending a Maps lookup on it.
+
+    Needs a space, 8+ characters and either a digit (street number / ZIP) or a partner name.
+    """
+    query = str(query or '').strip()
+    if len(query) < 8 or ' ' not in query or query.lower() == 'nan':
+        return False
+    return any(ch.isdigit() for ch in query) or ' in ' in query
+
+
+def _read_csv_as_text(path):
+    """Parse a CSV with pyarrow, every column as text.
+
+    pandas' engine='pyarrow' infers types before applying dtype=str, which drops leading zeros.
+    """
+    with pacsv.open_csv(path) as reader:
+        names = reader.schema.names
+    options = pacsv.ConvertOptions(column_types={name: pa.string() for name in names}, strings_can_be_null=True)
+    return pacsv.read_csv(path, convert_options=options).to_pandas()
+
+
+def read_table(path, dtype=None):
+    """Read a CSV, Excel or Parquet file based on its extension.
+
+    With `dtype=str` (raw inputs) CSV goes through the pyarrow parser and Excel through
+    calamine when it is installed; nothing is type-inferred, so a CSV Zip of '02134' stays
+    '02134'. In Excel that only holds for text cells: a number cell already stores 2134.
+    """
+    if path.endswith('.csv'):
+        if dtype is str:
+            return _read_csv_as_text(path)
+        return pd.read_csv(path)
+    if path.endswith(('.xlsx', '.xls')):
+        if dtype is str:
+            try:
+                return pd.read_excel(path, dtype=str, engine='calamine')
+            except (ImportError, ValueError):
+                # python-calamine missing, or pandas < 2.2 without the engine: use the default reader
+                pass
+        return pd.read_excel(path, dtype=dtype)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, engine='pyarrow')
+    raise ValueError("Unsupported file format. Use CSV, Excel or Parquet files.")
+
+
+def write_table(df, path):
+    """Write `df` in the format implied by the extension of `path`."""
+    if path.endswith('.csv'):
+        df.to_csv(path, index=False)
+    elif path.endswith('.parquet'):
+        df = df.copy()
+        # Arrow needs one type per column; spreadsheets often mix numbers and text (e.g. Zip, Phone)
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        df.to_parquet(path, index=False, engine='pyarrow', compression='zstd')
+    else:
+        # Only the final artifact is Excel; xlsxwriter writes it several times faster than openpyxl.
+        # Its constant_memory mode is skipped: pandas emits cells column by column, which it can't stream.
+        df.to_excel(path, index=False, engine='xlsxwriter')
+
+
+class AddressCache:
+    """SQLite-backed store of found addresses keyed by `normalize_query`, shared across runs."""
+
+    def __init__(self, path, ttl=ADDRESS_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS addresses("
+            "query TEXT PRIMARY KEY, standard_address TEXT, lookup_type TEXT, checked_at INTEGER)"
+        )
+        self._conn.commit()
+
+    key = staticmethod(normalize_query)
+
+    def get_many(self, queries):
+        """Return {query: (standard_address, lookup_type)} for the queries found within `ttl` seconds."""
+        by_key = {}
+        for query in queries:
+            by_key.setdefault(self.key(query), []).append(query)
+        if not by_key:
+            return {}
+        placeholders = ','.join('?' * len(by_key))
+        rows = self._conn.execute(
+            f"SELECT query, standard_address, lookup_type FROM addresses "
+            f"WHERE query IN ({placeholders}) AND checked_at >= ?",
+            (*by_key, int(time.time() - self.ttl))
+        ).fetchall()
+        return {query: (address, lookup_type) for key, address, lookup_type in rows for query in by_key[key]}
+
+    def put_many(self, results):
+        """Store {query: (standard_address, lookup_type)}; misses are not kept so they are retried."""
+        now = int(time.time())
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO addresses(query, standard_address, lookup_type, checked_at) VALUES (?, ?, ?, ?)",
+            [(self.key(query), address, lookup_type, now)
+             for query, (address, lookup_type) in results.items() if query and address != "N/A"]
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+# Runs every extraction strategy in-page and returns the candidate each would pick, in one round-trip:
+#   place_card  - the address button's text div, its "Address:" aria-label, then longer nested divs
+#   aria_labels - text after "Address:"/"Address"/"Located at" in any address aria-label
+#   buttons     - any address-ish button's text, else any button's nested div text
+ADDRESS_CANDIDATES_JS = """
+const text = el => ((el && el.innerText) || '').trim();
+const addressButtons = [...document.querySelectorAll('button[data-item-id="address"]')];
+
+const placeCard = [
+    text(addressButtons.length ? addressButtons[0].querySelector('div.Io6YTe.fontBodyMedium') : null),
+    ...addressButtons.map(b => {
+        const label = b.getAttribute('aria-label') || '';
+        return label.includes('Address:') ? label.split('Address:').join('').trim() : '';
+    }),
+    ...[...document.querySelectorAll('button[data-item-id="address"] div.Io6YTe')].map(text).filter(t => t.length > 15),
+    ...addressButtons.flatMap(b => [...b.querySelectorAll('div')].map(text)).filter(t => t.length > 20),
+].filter(t => t);
+
+const ariaLabels = [];
+// "ddress" matches both "Address" and "address", so the selector engine does the filtering
+for (const el of document.querySelectorAll('[aria-label*="ddress"]')) {
+    const label = el.getAttribute('aria-label');
+    for (const prefix of ['Address:', 'Address', 'Located at']) {
+        if (!label.includes(prefix)) continue;
+        const rest = label.slice(label.indexOf(prefix) + prefix.length).trim();
+        if (rest.length > 20) ariaLabels.push(rest);
+    }
+}
+
+const buttons = [
+    ...document.querySelectorAll('button[data-item-id*="address" i]'),
+    ...document.querySelectorAll('button div'),
+].map(text).filter(t => t.length > 20);
+
+return {
+    place_card: placeCard[0] || null,
+    aria_labels: ariaLabels[0] || null,
+    buttons: buttons[0] || null,
+};
+"""
+
 
 class GoogleMapsExtractor:
-    def __init__(self, headless=False, sleep_range=(1.5, 3.0)):
+    # One selector list, so the fallbacks cost a single chromedriver round-trip (matches come in document order)
+    RESULT_ANCHORS = (
+        By.CSS_SELECTOR,
+        'div[role="article"] a.hfpxzc, div.Nv2PK a.hfpxzc, div[role="article"] a[href*="/maps/place/"]',
+    )
+    ADDRESS_BUTTON = (By.CSS_SELECTOR, 'button[data-item-id="address"]')
+    MAIN_PANEL = (By.CSS_SELECTOR, '[role="main"]')
+    RESULTS_FEED = (By.CSS_SELECTOR, 'div[role="feed"]')
+    SEARCH_BOX = (By.ID, 'searchboxinput')
+    # What the previous query left on screen; it must go stale before the new page is read
+    PREVIOUS_RESULT = (By.CSS_SELECTOR, 'button[data-item-id="address"], div[role="feed"]')
+
+    # Resources the address extraction never reads: map tiles, photos, images, web fonts and video
+    BLOCKED_URLS = [
+        '*.googleusercontent.com/*',
+        '*/maps/vt/*',
+        '*/mapslite/*',
+        '*.png',
+        '*.jpg',
+        '*.jpeg',
+        '*.webp',
+        '*.woff*',
+        '*.ttf',
+        '*/AuthenticationService.Authenticate*',
+        '*.googlevideo.com/*',
+    ]
+
+    # Only DOM text is read, so GPU, sync, audio and other background subsystems are switched off
+    CHROME_ARGS = (
+        "--disable-blink-features=AutomationControlled",
+        "--disable-extensions",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--lang=en-US",
+        "--disable-gpu",
+        "--disable-software-rasterizer",
+        "--disable-background-networking",
+        "--disable-sync",
+        "--disable-default-apps",
+        "--disable-translate",
+        "--mute-audio",
+        "--blink-settings=imagesEnabled=false",
+    )
+    CHROME_PREFS = {
+        "intl.accept_languages": "en,en_US",
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    }
+
+    # Google's "unusual traffic" interstitial lives under /sorry/ and embeds a reCAPTCHA
+    BLOCKED_PAGE_JS = (
+        "return location.pathname.startsWith('/sorry')"
+        " || !!document.querySelector('#recaptcha, iframe[src*=\"recaptcha\"]');"
+    )
+    RESULTS_LIST_JS = (
+        "return !!document.querySelector('div[role=\"feed\"]')"
+        " && !document.querySelector('button[data-item-id=\"address\"]');"
+    )
+    # XHR Maps issues when a result is opened; its JSON carries the formatted address
+    PLACE_PREVIEW_URL = '/maps/preview/place'
+    # WebDriverWait polls every 0.5s by default; Maps usually settles well inside that
+    POLL_INTERVAL = 0.2
+    MIN_DELAY = 0.3
+    MAX_CONSECUTIVE_TIMEOUTS = 3
+    # In-page searches whose URL never changed before the box is given up on for the session
+    MAX_IN_PAGE_MISSES = 3
+    MAX_DELAY = 8.0
+
+    def __init__(self, headless=False, sleep_range=(1.5, 3.0), google_api_key=None, http_first=True):
         self.driver = None
         self.headless = headless
-        self.sleep_min = max(0.3, float(sleep_range[0]))
-        self.sleep_max = max(self.sleep_min, float(sleep_range[1]))
+        self._headless_new_ok = True
+        self.set_sleep_range(sleep_range)
+        self.set_api_key(google_api_key)
+        self._api_session = requests.Session()
+        self.http_first = http_first
+        self._http_session = requests.Session()
+        self._http_session.headers.update(HTTP_HEADERS)
         self.maps_base = "https://www.google.com/maps?hl=en&gl=us"
         self.max_load_retries = 2
         self.lookup_type = "direct"
+        self._strategies = ('place_card', 'aria_labels', 'buttons')
+        self.strategy_hits = Counter()
+        self._in_page_search = True
+        self._in_page_misses = 0
+        self.per_query_timeout = 30.0
+        self._deadline = None
+        self._timeouts = 0
+
+    def _chrome_options(self, headless_new=False):
+        """Build a fresh ChromeOptions; undetected_chromedriver refuses to reuse one."""
+        options = uc.ChromeOptions()
+        for argument in self.CHROME_ARGS:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", self.CHROME_PREFS)
+        # driver.get returns at DOMContentLoaded; every read below is gated by an explicit wait
+        options.page_load_strategy = "eager"
+
+        # Network events feed _address_from_network
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+        if headless_new:
+            options.add_argument("--headless=new")
+        elif self.headless:
+            options.add_argument("--window-position=-2400,-2400")
+        else:
+            options.add_argument("--start-maximized")
+        return options
+
+    def _launch_chrome(self):
+        """Start Chrome, preferring --headless=new when hidden and falling back to an off-screen window."""
+        if self.headless and self._headless_new_ok:
+            try:
+                self.driver = uc.Chrome(options=self._chrome_options(headless_new=True), version_main=144)
+                self.driver.current_url
+                return
+            except Exception as e:
+                # --headless=new crashes some Chrome 144 builds; don't try it again this session
+                logger.warning(f"--headless=new failed ({e}); using an off-screen window instead.")
+                self._headless_new_ok = False
+                self.quit()
+        self.driver = uc.Chrome(options=self._chrome_options(), version_main=144)
 
     def setup_driver(self):
         """Initialize undetected Chrome driver."""
         try:
-            options = uc.ChromeOptions()
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--lang=en-US")
-            options.add_experimental_option("prefs", {
-                "intl.accept_languages": "en,en_US",
-            })
-
-            if self.headless:
-                # --headless=new crashes Chrome 144; move window off-screen instead
-                options.add_argument("--window-position=-2400,-2400")
-            else:
-                options.add_argument("--start-maximized")
-
-            self.driver = uc.Chrome(options=options, version_main=144)
+            self._launch_chrome()
             self.driver.set_page_load_timeout(20)
             logger.info("Chrome driver initialized successfully")
+            self._block_heavy_resources()
 
             try:
                 self.driver.get(self.maps_base)
-                time.sleep(3)
-                logger.info("Initial Maps page loaded")
+                if self._wait_for_maps_loaded(timeout=8):
+                    logger.info("Initial Maps page loaded")
+                else:
+                    logger.warning("Initial Maps page did not finish loading; will retry per query.")
             except Exception:
                 logger.warning("Initial preload of Google Maps failed; will retry per query.")
 
@@ -61,68 +387,239 @@ class GoogleMapsExtractor:
             logger.error(f"Error initializing driver: {e}")
             return False
 
-    def _restart_driver(self):
-        """Restart the driver when Maps fails to load."""
+    def _block_heavy_resources(self):
+        """Stop Chrome from downloading BLOCKED_URLS; the address DOM loads without them."""
         try:
-            if self.driver:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.BLOCKED_URLS})
+        except Exception as e:
+            logger.warning(f"Could not block heavy resources: {e}")
+
+    def quit(self):
+        """Close the Chrome driver if it is running."""
+        if self.driver:
+            try:
                 self.driver.quit()
-        except Exception:
-            pass
-        self.driver = None
+            except Exception:
+                pass
+            self.driver = None
+            logger.info("Chrome driver closed")
+
+    def restart(self):
+        """Restart the driver when Maps fails to load.
+
+        setup_driver's preload wait gets its full timeout even mid-lookup: the current
+        query's (possibly already spent) deadline is set aside until the browser is back.
+        """
+        deadline, self._deadline = self._deadline, None
+        try:
+            self.quit()
+            return self.setup_driver()
+        finally:
+            self._deadline = deadline
+
+    def set_sleep_range(self, sleep_range):
+        """Update the starting pause between lookups without touching the browser."""
+        sleep_min = max(self.MIN_DELAY, float(sleep_range[0]))
+        sleep_max = max(sleep_min, float(sleep_range[1]))
+        if (sleep_min, sleep_max) != (getattr(self, 'sleep_min', None), getattr(self, 'sleep_max', None)):
+            self.sleep_min, self.sleep_max = sleep_min, sleep_max
+            self._current_delay = min(self.MAX_DELAY, (sleep_min + sleep_max) / 2)
+
+    def set_api_key(self, google_api_key):
+        """Use the Geocoding API before Selenium when a key is set; None turns it off."""
+        self.google_api_key = google_api_key or None
+        self._api_disabled = False
+
+    def _geocode_api(self, address):
+        """Return the Geocoding API's formatted address for `address`, or None to fall back to Maps."""
+        if not self.google_api_key or self._api_disabled:
+            return None
+        try:
+            response = self._api_session.get(
+                GEOCODE_API_URL, params={'address': address, 'key': self.google_api_key}, timeout=5
+            )
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Geocoding API request failed for {address}: {e}")
+            return None
+
+        status = payload.get('status')
+        if status in GEOCODE_API_FATAL:
+            logger.warning(f"Geocoding API unavailable ({status}); using Google Maps for the rest of the run.")
+            self._api_disabled = True
+            return None
+
+        results = payload.get('results') or []
+        # Partial matches are the API's guess at a nearby place; Maps usually does better on those
+        if status != 'OK' or not results or results[0].get('partial_match'):
+            return None
+        address_text = results[0].get('formatted_address', '').removesuffix(', USA')
+        return address_text if self._is_complete_address(address_text) else None
+
+    def _fast_fetch(self, url):
+        """Read an address out of the raw Maps search page, or None to fall back to Chrome.
+
+        Place pages carry "Name · Address" in their meta tags; otherwise the first complete
+        address in the embedded initial state is the top search result.
+        """
+        if not self.http_first:
+            return None
+        try:
+            response = self._http_session.get(url, timeout=5)
+        except requests.RequestException as e:
+            logger.debug(f"Plain HTTP fetch failed: {e}")
+            return None
+        if response.status_code == 429 or '/sorry/' in response.url:
+            logger.warning("Google is throttling plain HTTP search; using Chrome for the rest of the run.")
+            self.http_first = False
+            return None
+        if not response.ok or not response.text:
+            return None
+
+        page = lxml.html.fromstring(response.text)
+        meta = page.xpath(
+            '//meta[@itemprop="address"]/@content | //meta[@property="og:title"]/@content'
+            ' | //meta[@itemprop="name"]/@content'
+        )
+        candidates = [part.strip() for content in meta for part in content.split('·')]
+        candidates += EMBEDDED_ADDRESS_RE.findall(response.text)
+        return next((text for text in candidates if self._is_complete_address(text)), None)
+
+    def ensure_driver(self):
+        """Reuse the running driver when it still responds, otherwise start a new one."""
+        if self.driver:
+            try:
+                self.driver.current_url
+                return True
+            except Exception:
+                logger.warning("Existing Chrome session is unresponsive; restarting.")
+                return self.restart()
         return self.setup_driver()
 
-    def _human_pause(self):
-        """Sleep for a randomized interval within the configured range."""
-        delay = random.uniform(self.sleep_min, self.sleep_max)
-        time.sleep(delay)
+    def _wait(self, timeout):
+        """WebDriverWait on the current driver, polling every POLL_INTERVAL seconds.
+
+        Inside a lookup the timeout is clipped to what is left of the query's budget.
+        """
+        if self._deadline is not None:
+            timeout = min(timeout, max(1.0, self._deadline - time.monotonic()))
+        return WebDriverWait(self.driver, timeout, poll_frequency=self.POLL_INTERVAL)
+
+    def _out_of_time(self):
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def _timed_out(self, address):
+        """Give up on a slow lookup; several in a row restart Chrome."""
+        logger.warning(f"Gave up on {address} after {self.per_query_timeout:.0f}s")
+        self._record_outcome('failed')
+        self._timeouts += 1
+        if self._timeouts >= self.MAX_CONSECUTIVE_TIMEOUTS:
+            logger.warning(f"{self._timeouts} lookups in a row ran out of time; restarting Chrome.")
+            self._timeouts = 0
+            self.restart()
+        return "N/A", "timeout"
+
+    def _drain_network_log(self):
+        """Return and clear the performance log entries buffered since the last call."""
+        try:
+            return self.driver.get_log('performance')
+        except Exception:
+            return []
+
+    def _address_from_network(self):
+        """Read the address out of the place-preview JSON Maps fetched, before touching the DOM."""
+        for entry in self._drain_network_log():
+            message = entry.get('message', '')
+            # Cheap substring test first; the log holds every network event of the page
+            if self.PLACE_PREVIEW_URL not in message:
+                continue
+            try:
+                msg = orjson.loads(message).get('message', {})
+                # Exact match: responseReceivedExtraInfo / ...EarlyHints carry no 'response'
+                if msg.get('method') != 'Network.responseReceived':
+                    continue
+                params = msg.get('params', {})
+                if self.PLACE_PREVIEW_URL not in params.get('response', {}).get('url', ''):
+                    continue
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+            except Exception:
+                continue
+            for text in EMBEDDED_ADDRESS_RE.findall(body.get('body', '')):
+                if self._is_complete_address(text):
+                    return text
+        return None
+
+    def _is_results_list(self):
+        """True when Maps shows a results feed and no place card, so there is nothing to extract yet."""
+        try:
+            return bool(self.driver.execute_script(self.RESULTS_LIST_JS))
+        except Exception:
+            return False
+
+    def _is_blocked(self):
+        """True when Google is showing its CAPTCHA / unusual-traffic page instead of Maps."""
+        try:
+            return bool(self.driver.execute_script(self.BLOCKED_PAGE_JS))
+        except Exception:
+            return False
+
+    def _record_outcome(self, outcome):
+        """Adapt the pause: shrink after a found address, double on a failed load, max out on a CAPTCHA.
+
+        'miss' (Maps loaded but had no address) leaves the pause alone.
+        """
+        if outcome == 'blocked':
+            self._current_delay = self.MAX_DELAY
+        elif outcome == 'failed':
+            self._current_delay = min(self.MAX_DELAY, self._current_delay * 2)
+        elif outcome == 'found':
+            self._current_delay = max(self.MIN_DELAY, self._current_delay * 0.8)
+            self._timeouts = 0
+
+    def _adaptive_pause(self):
+        """Sleep for the current adaptive delay with ±25% jitter."""
+        time.sleep(self._current_delay * random.uniform(0.75, 1.25))
 
     def _click_first_search_result(self):
         """Click on the first search result in the list."""
         try:
-            # Wait for search results feed
+            # Wait for search results feed with a clickable result in it
             try:
-                WebDriverWait(self.driver, 8).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div[role="feed"]'))
+                self._wait(8).until(
+                    EC.presence_of_element_located(self.RESULTS_FEED)
                 )
             except TimeoutException:
                 logger.debug("No search results feed found")
                 return False
 
-            time.sleep(0.5)
+            try:
+                self._wait(3).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, 'div[role="feed"] a.hfpxzc'))
+                )
+            except TimeoutException:
+                logger.debug("No clickable result anchor yet; trying fallback selectors")
 
             # Find the first result link
-            selectors = [
-                'div[role="article"] a.hfpxzc',
-                'div.Nv2PK a.hfpxzc',
-                'div[role="article"] a[href*="/maps/place/"]',
-            ]
-
-            first_result = None
-            for sel in selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, sel)
-                if elements:
-                    first_result = elements[0]
-                    break
+            elements = self.driver.find_elements(*self.RESULT_ANCHORS)
+            first_result = elements[0] if elements else None
 
             if not first_result:
                 logger.warning("Could not find first search result")
                 return False
 
-            try:
-                aria_label = first_result.get_attribute('aria-label')
-                logger.info(f"Found first result: {aria_label[:100] if aria_label else 'No label'}")
-            except:
-                pass
-
-            # Click using JS (most reliable)
-            self.driver.execute_script("arguments[0].click();", first_result)
-            logger.info("Clicked first result")
+            # Click using JS (most reliable); the label comes back in the same round-trip
+            aria_label = self.driver.execute_script(
+                "arguments[0].click(); return arguments[0].getAttribute('aria-label');", first_result
+            )
+            logger.info(f"Clicked first result: {aria_label[:100] if aria_label else 'No label'}")
 
             # Wait for place details to appear
             try:
-                WebDriverWait(self.driver, 10).until(
+                self._wait(10).until(
                     EC.any_of(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, 'button[data-item-id="address"]')),
+                        EC.presence_of_element_located(self.ADDRESS_BUTTON),
                         EC.presence_of_element_located((By.CSS_SELECTOR, '[role="main"] [data-item-id]')),
                     )
                 )
@@ -136,6 +633,41 @@ class GoogleMapsExtractor:
             logger.error(f"Error clicking first search result: {e}")
             return False
 
+    def _search_in_page(self, address):
+        """Run the query through the already-loaded Maps search box instead of reloading the app.
+
+        Returns False (so the caller falls back to driver.get) when no search box is on screen
+        or the URL did not change. The URL legitimately stays put when two queries resolve to
+        the same place, so only MAX_IN_PAGE_MISSES of those in a row, or an error driving the
+        box itself, turn in-page search off for the session.
+        """
+        if not self._in_page_search:
+            return False
+        try:
+            boxes = self.driver.find_elements(*self.SEARCH_BOX)
+            if not boxes:
+                return False
+            previous = self.driver.find_elements(*self.PREVIOUS_RESULT)
+            old_url = self.driver.current_url
+            boxes[0].clear()
+            boxes[0].send_keys(address, Keys.RETURN)
+            try:
+                self._wait(10).until(EC.url_changes(old_url))
+            except TimeoutException:
+                self._in_page_misses += 1
+                if self._in_page_misses >= self.MAX_IN_PAGE_MISSES:
+                    logger.warning("In-page search keeps leaving the URL unchanged; reloading Maps for each query from now on")
+                    self._in_page_search = False
+                return False
+            self._in_page_misses = 0
+            if previous:
+                self._wait(10).until(EC.staleness_of(previous[0]))
+            return True
+        except Exception as e:
+            logger.warning(f"In-page search failed; reloading Maps for each query from now on: {e}")
+            self._in_page_search = False
+            return False
+
     def _is_complete_address(self, text):
         """
         Check if the address is COMPLETE with city, state, and ZIP code.
@@ -143,152 +675,47 @@ class GoogleMapsExtractor:
         """
         if not text or len(text) < 20:
             return False
+        if not ZIP_RE.search(text) or not STATE_RE.search(text):
+            return False
+        # Two commas already mean "street, city, state"; the city regex is only the fallback
+        return text.count(',') >= 2 or bool(CITY_STATE_RE.search(text))
 
-        has_zip = bool(re.search(r'\b\d{5}(-\d{4})?\b', text))
-        has_state = bool(re.search(r'\b[A-Z]{2}\b', text))
-        has_city = bool(re.search(r',\s*[A-Za-z\s]+,\s*[A-Z]{2}', text))
-        has_commas = text.count(',') >= 2
-
-        return has_zip and has_state and (has_city or has_commas)
+    def _collect_address_candidates(self):
+        """Return {strategy: first candidate address or None} from a single in-page script."""
+        try:
+            self._wait(8).until(EC.presence_of_element_located(self.MAIN_PANEL))
+        except TimeoutException:
+            logger.debug("Main panel not present; scanning the page anyway")
+        return self.driver.execute_script(ADDRESS_CANDIDATES_JS) or {}
 
     def _extract_address_multiple_strategies(self):
         """Try multiple strategies to extract the COMPLETE address from Google Maps."""
-        strategies = [
-            self._extract_from_place_card,
-            self._extract_from_aria_labels,
-            self._extract_from_buttons
-        ]
-
-        for strategy in strategies:
-            try:
-                address = strategy()
-                if address and address.strip():
-                    if self._is_complete_address(address):
-                        logger.info(f"Complete address found using {strategy.__name__}: {address}")
-                        return address.strip()
-                    else:
-                        logger.warning(f"Incomplete address rejected from {strategy.__name__}: {address}")
-            except Exception as e:
-                logger.debug(f"{strategy.__name__} failed: {e}")
-                continue
-
-        return None
-
-    def _extract_from_place_card(self):
-        """Extract address from the place information card (detail page only)."""
         try:
-            WebDriverWait(self.driver, 8).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[role="main"]'))
-            )
-
-            try:
-                address_button = self.driver.find_element(By.CSS_SELECTOR, 'button[data-item-id="address"]')
-                address_div = address_button.find_element(By.CSS_SELECTOR, 'div.Io6YTe.fontBodyMedium')
-                text = address_div.text.strip()
-                if text:
-                    logger.info(f"Extracted from place card button: {text}")
-                    return text
-            except NoSuchElementException:
-                logger.debug("Could not find button[data-item-id='address']")
-
-            try:
-                buttons = self.driver.find_elements(By.CSS_SELECTOR, 'button[data-item-id="address"]')
-                for button in buttons:
-                    aria_label = button.get_attribute('aria-label')
-                    if aria_label and 'Address:' in aria_label:
-                        address = aria_label.replace('Address:', '').strip()
-                        if address:
-                            logger.info(f"Extracted from aria-label: {address}")
-                            return address
-            except:
-                pass
-
-            try:
-                address_divs = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    'button[data-item-id="address"] div.Io6YTe'
-                )
-                for div in address_divs:
-                    text = div.text.strip()
-                    if text and len(text) > 15:
-                        logger.info(f"Extracted from Io6YTe div: {text}")
-                        return text
-            except:
-                pass
-
-            try:
-                buttons = self.driver.find_elements(By.CSS_SELECTOR, 'button[data-item-id="address"]')
-                for button in buttons:
-                    divs = button.find_elements(By.TAG_NAME, 'div')
-                    for div in divs:
-                        text = div.text.strip()
-                        if text and len(text) > 20:
-                            logger.info(f"Extracted from button div: {text}")
-                            return text
-            except:
-                pass
-
-            return None
-        except Exception as e:
-            logger.debug(f"_extract_from_place_card error: {e}")
-            return None
-
-    def _extract_from_aria_labels(self):
-        """Extract address from aria-labels."""
-        try:
-            elements = self.driver.find_elements(
-                By.XPATH,
-                '//*[@aria-label and (contains(@aria-label, "Address") or contains(@aria-label, "address"))]'
-            )
-
-            for element in elements:
-                aria_label = element.get_attribute('aria-label')
-                if aria_label:
-                    for prefix in ['Address:', 'Address', 'Located at']:
-                        if prefix in aria_label:
-                            address = aria_label.split(prefix, 1)[1].strip()
-                            if len(address) > 20:
-                                return address
-
-            return None
+            candidates = self._collect_address_candidates()
         except Exception as e:
-            logger.debug(f"_extract_from_aria_labels error: {e}")
+            logger.debug(f"Collecting address candidates failed: {e}")
             return None
 
-    def _extract_from_buttons(self):
-        """Extract address from buttons with data attributes."""
-        try:
-            buttons = self.driver.find_elements(By.TAG_NAME, 'button')
-
-            for button in buttons:
-                data_item_id = button.get_attribute('data-item-id')
-                if data_item_id and 'address' in data_item_id.lower():
-                    text = button.text.strip()
-                    if text and len(text) > 20:
-                        return text
-
-                try:
-                    nested_divs = button.find_elements(By.TAG_NAME, 'div')
-                    for div in nested_divs:
-                        text = div.text.strip()
-                        if text and len(text) > 20:
-                            return text
-                except:
-                    continue
+        for strategy in self._strategies:
+            address = candidates.get(strategy)
+            if address and address.strip():
+                if self._is_complete_address(address):
+                    logger.info(f"Complete address found using {strategy}: {address}")
+                    self.strategy_hits[strategy] += 1
+                    return address.strip()
+                else:
+                    logger.warning(f"Incomplete address rejected from {strategy}: {address}")
 
-            return None
-        except Exception as e:
-            logger.debug(f"_extract_from_buttons error: {e}")
-            return None
+        return None
 
     def _wait_for_maps_loaded(self, timeout=10):
         """Wait until any Google Maps page element is present."""
         try:
-            WebDriverWait(self.driver, timeout).until(
+            self._wait(timeout).until(
                 EC.any_of(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'button[data-item-id="address"]')),
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[role="main"]')),
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div[role="feed"]')),
+                    EC.presence_of_element_located(self.ADDRESS_BUTTON),
+                    EC.presence_of_element_located(self.MAIN_PANEL),
+                    EC.presence_of_element_located(self.RESULTS_FEED),
                     EC.presence_of_element_located((By.ID, "searchboxinput")),
                     EC.presence_of_element_located((By.XPATH, '//canvas[@aria-label="Map"]')),
                 )
@@ -302,92 +729,111 @@ class GoogleMapsExtractor:
     def search_address_on_maps(self, address):
         """Search for an address on Google Maps and extract the standard address."""
         try:
+            address_text = self._geocode_api(address)
+            if address_text:
+                logger.info(f"Found address via Geocoding API: {address_text}")
+                self.lookup_type = "geocode_api"
+                return address_text, self.lookup_type
+
             self.lookup_type = "direct"
 
             encoded_address = quote(address)
-            url = f"https://www.google.com/maps/search/{encoded_address}?hl=en&gl=us"
+            # A bare street address usually resolves straight to its place page; "<partner> in ..."
+            # needs the search list. Maps treats both paths as a search when it can't resolve one place,
+            # so the click-first-result fallback below works either way.
+            path = "search" if ' in ' in address else "place"
+            url = f"https://www.google.com/maps/{path}/{encoded_address}?hl=en&gl=us"
 
             logger.info(f"Searching for: {address}")
 
+            address_text = self._fast_fetch(url)
+            if address_text:
+                logger.info(f"Found address without the browser: {address_text}")
+                self.lookup_type = "http"
+                return address_text, self.lookup_type
+
+            # Every wait from here on draws from one per-query budget
+            self._deadline = time.monotonic() + self.per_query_timeout
+            self._drain_network_log()
             try:
-                self.driver.get(url)
+                if not self._search_in_page(address):
+                    self.driver.get(url)
             except TimeoutException:
                 logger.warning(f"Page load timed out for: {address}")
             except Exception as e:
                 logger.warning(f"Navigation error for: {address}: {e}")
                 try:
-                    self._restart_driver()
+                    self.restart()
                     self.driver.get(url)
                 except Exception:
+                    self._record_outcome('failed')
                     return "N/A", "N/A"
 
             # Wait for Maps to load any recognizable element
             if not self._wait_for_maps_loaded(timeout=12):
-                logger.warning(f"Maps did not load for: {address}")
+                if self._out_of_time():
+                    return self._timed_out(address)
+                if self._is_blocked():
+                    logger.warning(f"Google is asking for a CAPTCHA; backing off to {self.MAX_DELAY:.0f}s")
+                    self._record_outcome('blocked')
+                else:
+                    logger.warning(f"Maps did not load for: {address}")
+                    self._record_outcome('failed')
                 return "N/A", "N/A"
 
-            # STEP 1: Check if Maps redirected directly to a place page
-            address_text = self._extract_address_multiple_strategies()
+            # STEP 1: Check if Maps redirected directly to a place page (skip when it plainly showed a list)
+            address_text = None if self._is_results_list() else self._extract_address_multiple_strategies()
 
             if address_text and self._is_complete_address(address_text):
                 logger.info(f"Found address directly: {address_text}")
                 self.lookup_type = "direct"
+                self._record_outcome('found')
                 return address_text, self.lookup_type
 
+            if self._out_of_time():
+                return self._timed_out(address)
+
             # STEP 2: We got search results instead — click the first one
             logger.info("No direct place page. Clicking first search result...")
+            self._drain_network_log()
             if self._click_first_search_result():
                 self.lookup_type = "indirect"
-                address_text = self._extract_address_multiple_strategies()
+                address_text = self._address_from_network() or self._extract_address_multiple_strategies()
 
                 if address_text and self._is_complete_address(address_text):
                     logger.info(f"Found address after clicking result: {address_text}")
+                    self._record_outcome('found')
                     return address_text, self.lookup_type
 
+            if self._out_of_time():
+                return self._timed_out(address)
             logger.warning(f"Could not extract address for: {address}")
+            self._record_outcome('miss')
             return "N/A", "N/A"
 
         except Exception as e:
             logger.error(f"Error searching for address '{address}': {e}")
+            self._record_outcome('failed')
             return "N/A", "N/A"
 
+        finally:
+            self._deadline = None
+
     def _prepare_dataframe(self, df, keep_existing=False):
-        """Build helper columns from the source data."""
+        """Build helper columns from the source data.
+
+        `df` gains the search columns in place; callers pass a frame they just read.
+        """
         required_cols = ['Street', 'Street2', 'City', 'State', 'Zip', 'Display Partner']
         missing = [col for col in required_cols if col not in df.columns]
         if missing:
             raise ValueError(f"Missing required columns: {', '.join(missing)}")
 
-        df = df.copy()
-        df['street_'] = df['Street'].fillna('').replace('nan', '').astype(str).str.strip()
-        street2 = df['Street2'].fillna('').replace('nan', '').astype(str).str.strip()
-        df.loc[df['street_'] == '', 'street_'] = street2[df['street_'] == '']
-
-        def build_query(row):
-            def clean(val):
-                if pd.isna(val):
-                    return ""
-                text = str(val).strip()
-                if text.lower() == "nan":
-                    return ""
-                text = re.sub(r'\s*\([^)]*\)', '', text).strip()
-                return text
-
-            parts = [
-                clean(row.get('street_')),
-                clean(row.get('City')),
-                clean(row.get('State')),
-                clean(row.get('Zip')),
-            ]
-            body = " ".join(part for part in parts if part).strip()
-
-            display_partner = str(row.get('Display Partner', '') or '').strip()
-            if display_partner:
-                return f"{display_partner} in {body}".strip()
-            return body
-
-        df['search_query'] = df.apply(build_query, axis=1)
-        df = df.drop_duplicates(subset=['search_query']).reset_index(drop=True)
+        # A resumed working copy already carries the queries its results were looked up with
+        if not (keep_existing and {'street_', 'search_query'} <= set(df.columns)):
+            add_search_columns(df)
+        # Queries differing only in case, punctuation or spacing are one Maps lookup
+        df = df[~_normalize_queries(df['search_query']).duplicated()].reset_index(drop=True)
 
         if not keep_existing or 'standard_address' not in df.columns:
             df['standard_address'] = "N/A"
@@ -410,37 +856,111 @@ class GoogleMapsExtractor:
 
         return df
 
-    def process_file(self, input_file, output_file, progress_callback=None, resume=False, batch_size=10):
-        """Process the input file and create output with standard addresses."""
+    @staticmethod
+    def checkpoint_path(output_file):
+        """Parquet file that holds per-batch progress; the output itself when it is already Parquet."""
+        if output_file.endswith('.parquet'):
+            return output_file
+        return f"{output_file}.parquet"
+
+    def process_queries(self, queries, progress_callback=None):
+        """Look up each distinct query once and return {query: (standard_address, lookup_type)}."""
+        unique_queries = list(dict.fromkeys(queries))
+        results = {}
+
+        for done, query in enumerate(unique_queries, start=1):
+            searched = is_searchable_query(query)
+            if searched:
+                results[query] = self.search_address_on_maps(str(query))
+            else:
+                results[query] = ("N/A", "N/A")
+                logger.warning(f"Skipping query that can't be an address: {query!r}")
+
+            if progress_callback:
+                progress_callback(done, len(unique_queries))
+
+            # Nothing was sent to Maps for skipped and API-answered queries, so no cooldown
+            if searched and results[query][1] != "geocode_api":
+                self._adaptive_pause()
+
+        return results
+
+    @staticmethod
+    def process_queries_in_pool(pool, queries, progress_callback=None):
+        """Like `process_queries`, but spreads the distinct queries over `pool`'s Chrome processes."""
+        unique_queries = list(dict.fromkeys(queries))
+        results = {query: ("N/A", "N/A") for query in unique_queries if not is_searchable_query(query)}
+
+        futures = [pool.submit(_lookup_in_worker, query) for query in unique_queries if query not in results]
+        for done, future in enumerate(as_completed(futures), start=len(results) + 1):
+            query, result = future.result()
+            results[query] = result
+            if progress_callback:
+                progress_callback(done, len(unique_queries))
+
+        return results
+
+    def _checkpoint_batch(self, snapshot, seq, rows, addresses, lookup_types, path):
+        """Apply one batch's results to the writer's snapshot and save it.
+
+        When a newer batch is already queued the rewrite is left to it, so slow writes coalesce.
+        """
+        snapshot.loc[rows, 'standard_address'] = addresses
+        snapshot.loc[rows, 'lookup_type'] = lookup_types
+        snapshot.loc[rows, 'processed'] = True
+        if seq == self._checkpoint_seq:
+            write_table(snapshot, path)
+
+    def process_file(self, input_file, output_file, progress_callback=None, resume=False, batch_size=10,
+                     keep_driver=False, workers=1, cache_path=ADDRESS_CACHE_PATH):
+        """Process the input file and create output with standard addresses.
+
+        With `keep_driver=True` the Chrome session is left running for the next call.
+        With `workers > 1` lookups run in that many processes, each with its own Chrome.
+        Found addresses are remembered in `cache_path` (None disables it) and reused across runs.
+        Batch checkpoints are written on a background thread while the next batch is scraped.
+        """
+        writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint')
+        pending_writes = []
+        self._checkpoint_seq = 0
+        pool = None
+        cache = None
         try:
-            if resume and output_file and output_file.endswith(('.csv', '.xlsx', '.xls')) and os.path.exists(output_file):
-                if output_file.endswith('.csv'):
-                    df = pd.read_csv(output_file)
-                else:
-                    df = pd.read_excel(output_file)
+            checkpoint = self.checkpoint_path(output_file)
+            resume_from = None
+            if resume:
+                resume_from = next((path for path in (checkpoint, output_file) if os.path.exists(path)), None)
+
+            if resume_from and resume_from.endswith(TABLE_EXTENSIONS):
+                df = read_table(resume_from)
                 df = self._prepare_dataframe(df, keep_existing=True)
-                logger.info("Resuming from existing output file.")
+                logger.info(f"Resuming from {resume_from}.")
             else:
-                if input_file.endswith('.csv'):
-                    df = pd.read_csv(input_file)
-                elif input_file.endswith(('.xlsx', '.xls')):
-                    df = pd.read_excel(input_file)
-                else:
-                    raise ValueError("Unsupported file format. Use CSV or Excel files.")
-
+                df = read_table(input_file, dtype=str)
                 df = self._prepare_dataframe(df, keep_existing=False)
-                if output_file.endswith('.csv'):
-                    df.to_csv(output_file, index=False)
-                else:
-                    df.to_excel(output_file, index=False)
+                write_table(df, checkpoint)
                 logger.info("Created fresh working copy.")
 
-            if not self.setup_driver():
+            if cache_path:
+                cache = AddressCache(cache_path)
+
+            if workers > 1:
+                # Spawn, not fork: a forked child would share this process's Chrome session
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.headless, (self.sleep_min, self.sleep_max), self.google_api_key),
+                )
+            elif not self.ensure_driver():
                 raise Exception("Failed to initialize Chrome driver")
 
             total_rows = len(df)
             logger.info(f"Processing {total_rows} addresses...")
 
+            # Owned by the writer thread: batches are replayed onto it, so the loop never copies df
+            snapshot = df.copy()
+
             pending_mask = df['processed'].astype(bool) == False
             pending_indices = df.index[pending_mask].tolist()
             base_completed = total_rows - len(pending_indices)
@@ -448,38 +968,51 @@ class GoogleMapsExtractor:
             for batch_start in range(0, len(pending_indices), max(1, int(batch_size))):
                 batch_indices = pending_indices[batch_start: batch_start + int(batch_size)]
 
-                for processed_count, idx in enumerate(batch_indices, start=1):
-                    query = df.loc[idx, 'search_query']
-
-                    if not query:
-                        df.loc[idx, 'standard_address'] = "N/A"
-                        df.loc[idx, 'lookup_type'] = "N/A"
-                        logger.warning(f"Row {idx+1}: Empty query, skipping")
-                    else:
-                        address, lookup_type = self.search_address_on_maps(str(query))
-                        df.loc[idx, 'standard_address'] = address
-                        df.loc[idx, 'lookup_type'] = lookup_type
-
-                    df.loc[idx, 'processed'] = True
+                batch_queries = df.loc[batch_indices, 'search_query']
 
+                def batch_progress(done, _total, offset=base_completed + batch_start):
                     if progress_callback:
-                        processed_so_far = base_completed + batch_start + processed_count
-                        progress_callback(processed_so_far, total_rows)
-
-                    self._human_pause()
+                        progress_callback(offset + done, total_rows)
 
-                if output_file.endswith('.csv'):
-                    df.to_csv(output_file, index=False)
-                else:
-                    df.to_excel(output_file, index=False)
-                logger.info(f"Progress saved after batch ending at row {batch_indices[-1] + 1}.")
-
-            if output_file.endswith('.csv'):
-                df.to_csv(output_file, index=False)
-            else:
-                df.to_excel(output_file, index=False)
+                results = cache.get_many(batch_queries) if cache else {}
+                misses = [query for query in batch_queries if query not in results]
+                if misses:
+                    if pool:
+                        fresh = self.process_queries_in_pool(pool, misses, progress_callback=batch_progress)
+                    else:
+                        fresh = self.process_queries(misses, progress_callback=batch_progress)
+                    results.update(fresh)
+                    if cache:
+                        cache.put_many(fresh)
+                if progress_callback:
+                    progress_callback(base_completed + batch_start + len(batch_indices), total_rows)
+                # One label-aligned write per column per batch; rows are never assigned one by one
+                addresses, lookup_types = zip(*(results[query] for query in batch_queries))
+                df.loc[batch_indices, 'standard_address'] = list(addresses)
+                df.loc[batch_indices, 'lookup_type'] = list(lookup_types)
+                df.loc[batch_indices, 'processed'] = True
+
+                # Surface failed writes from earlier batches
+                for done_write in [write for write in pending_writes if write.done()]:
+                    pending_writes.remove(done_write)
+                    done_write.result()
+                self._checkpoint_seq += 1
+                pending_writes.append(writer.submit(
+                    self._checkpoint_batch, snapshot, self._checkpoint_seq, batch_indices,
+                    list(addresses), list(lookup_types), checkpoint
+                ))
+                logger.info(f"Saving progress after batch ending at row {batch_indices[-1] + 1}.")
+
+            for write in pending_writes:
+                write.result()
+            if checkpoint != output_file:
+                write_table(df, output_file)
+                if os.path.exists(checkpoint):
+                    os.remove(checkpoint)
 
             logger.info(f"Processing complete! Output saved to: {output_file}")
+            if self.strategy_hits:
+                logger.info(f"DOM strategy hits this session: {dict(self.strategy_hits)}")
             return True, df
 
         except Exception as e:
@@ -487,24 +1020,53 @@ class GoogleMapsExtractor:
             return False, str(e)
 
         finally:
-            if self.driver:
-                self.driver.quit()
-                logger.info("Chrome driver closed")
+            writer.shutdown(wait=True)
+            if cache:
+                cache.close()
+            if pool:
+                pool.shutdown(wait=True, cancel_futures=True)
+            if not keep_driver:
+                self.quit()
+
+
+# Per-process extractor used by the worker pool in `process_file(workers > 1)`
+_worker_extractor = None
+
+
+def _init_worker(headless, sleep_range, google_api_key):
+    """Give each pool process its own extractor; Chrome is closed when the process exits."""
+    global _worker_extractor
+    _worker_extractor = GoogleMapsExtractor(headless=headless, sleep_range=sleep_range, google_api_key=google_api_key)
+    # Pool processes skip atexit handlers, but multiprocessing finalizers still run
+    multiprocessing.util.Finalize(None, _worker_extractor.quit, exitpriority=10)
+
+
+def _lookup_in_worker(query):
+    """Look up one query in a pool process and return (query, (standard_address, lookup_type))."""
+    extractor = _worker_extractor
+    if not is_searchable_query(query) or not extractor.ensure_driver():
+        return query, ("N/A", "N/A")
+    result = extractor.search_address_on_maps(str(query))
+    if result[1] != "geocode_api":
+        extractor._adaptive_pause()
+    return query, result
 
 
 def main():
     """Main function for command-line usage"""
     import sys
 
-    if len(sys.argv) != 3:
-        print("Usage: python maps_extractor.py <input_file> <output_file>")
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python maps_extractor.py <input_file> <output_file> [workers]")
         sys.exit(1)
 
     input_file = sys.argv[1]
     output_file = sys.argv[2]
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else 1
 
-    extractor = GoogleMapsExtractor()
-    success, result = extractor.process_file(input_file, output_file)
+    # Callers pass the key explicitly (None disables the API); the CLI takes it from the environment
+    extractor = GoogleMapsExtractor(headless=workers > 1, google_api_key=os.environ.get('GOOGLE_MAPS_API_KEY'))
+    success, result = extractor.process_file(input_file, output_file, workers=workers)
 
     if success:
         print(f"\n Success! Output saved to: {output_file}")
@@ -6,7 +6,9 @@ import folium
 from folium import Marker, PolyLine
 from streamlit_folium import folium_static
 import io
-from math import radians, sin, cos, sqrt, atan2
+from math import asin, cos, sin, sqrt
+import kmedoids
+from numba import njit, prange
 
 # Page configuration
 st.set_page_config(page_title="Sales Route Optimizer", layout="wide", page_icon="🗺️")
@@ -33,20 +35,146 @@ st.markdown("""
 st.markdown('<div class="main-header">🗺️ Sales Route Optimizer</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-header">Optimize daily visit clusters for sales personnel</div>', unsafe_allow_html=True)
 
+# Largest input clustered with FasterPAM; its float32 n x n matrix is ~36 MB here
+PAM_MAX_POINTS = 3000
+# DBSCAN neighbourhood radius
+DBSCAN_EPS_KM = 1.1
+
 # Helper Functions
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calculate haversine distance between two points in km"""
+def _haversine_rad(lat1, lon1, lat2, lon2):
+    """Haversine distance in km between points given in radians.
+
+    Accepts scalars or NumPy arrays and broadcasts, so one call can cover a whole matrix of pairs.
+    """
     R = 6371  # Earth's radius in km
     
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
     dlat = lat2 - lat1
     dlon = lon2 - lon1
     
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
     
     return R * c
 
+def pairwise_haversine(lat, lng, block=1024):
+    """Full n x n haversine matrix (float32, km) for points in radians, filled in block x block tiles.
+
+    Each tile's sin/cos temporaries stay cache-sized instead of each being a full n x n array.
+    """
+    n = lat.shape[0]
+    out = np.empty((n, n), dtype=np.float32)
+    for i0 in range(0, n, block):
+        rows = slice(i0, i0 + block)
+        for j0 in range(0, n, block):
+            cols = slice(j0, j0 + block)
+            out[rows, cols] = _haversine_rad(lat[rows, None], lng[rows, None], lat[None, cols], lng[None, cols])
+    return out
+
+@njit(cache=True, fastmath=True)
+def _haversine_scalar(lat1, lon1, lat2, lon2):
+    """Haversine distance in km for one pair in radians; compiled, so loops over it stay native"""
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    return 2 * 6371 * asin(sqrt(min(1.0, max(0.0, a))))
+
+@njit(cache=True, fastmath=True)
+def _haversine_cos(lat1, lon1, cos_lat1, lat2, lon2, cos_lat2):
+    """_haversine_scalar with cos(lat) of both ends supplied, for loops that reuse the same points"""
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat/2)**2 + cos_lat1 * cos_lat2 * sin(dlon/2)**2
+    return 2 * 6371 * asin(sqrt(min(1.0, max(0.0, a))))
+
+@njit(cache=True, fastmath=True)
+def _nn_route(lats, lngs, cos_lats, start_lat, start_lng):
+    """Greedy nearest-neighbour order over points in radians, starting from (start_lat, start_lng)
+
+    cos_lats is np.cos(lats); the O(n^2) scan below then only evaluates the dlat/dlon sines.
+    """
+    n = lats.shape[0]
+    order = np.empty(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=np.bool_)
+    current_lat, current_lng, current_cos = start_lat, start_lng, cos(start_lat)
+    
+    for step in range(n):
+        nearest = -1
+        nearest_dist = 0.0
+        for j in range(n):
+            if visited[j]:
+                continue
+            dist = _haversine_cos(current_lat, current_lng, current_cos, lats[j], lngs[j], cos_lats[j])
+            if nearest < 0 or dist < nearest_dist:
+                nearest = j
+                nearest_dist = dist
+        order[step] = nearest
+        visited[nearest] = True
+        current_lat, current_lng, current_cos = lats[nearest], lngs[nearest], cos_lats[nearest]
+    
+    return order
+
+@njit(cache=True, fastmath=True)
+def _two_opt(order, lats, lngs, cos_lats, start_lat, start_lng, legs):
+    """2-opt polish of a visiting order as a closed tour start -> stops -> start
+
+    Reverses any segment whose endpoints swap to a shorter tour until no swap helps.
+    Distances come from one small matrix with the start at node 0; the polished tour's
+    legs (km into each stop from the one before it) are read back out of it into `legs`.
+    """
+    n = order.shape[0]
+    node_lat = np.empty(n + 1)
+    node_lng = np.empty(n + 1)
+    node_cos = np.empty(n + 1)
+    node_lat[0], node_lng[0], node_cos[0] = start_lat, start_lng, cos(start_lat)
+    for k in range(n):
+        node_lat[k + 1], node_lng[k + 1], node_cos[k + 1] = lats[order[k]], lngs[order[k]], cos_lats[order[k]]
+    
+    D = np.empty((n + 1, n + 1))
+    for a in range(n + 1):
+        for b in range(n + 1):
+            D[a, b] = _haversine_cos(node_lat[a], node_lng[a], node_cos[a], node_lat[b], node_lng[b], node_cos[b])
+    
+    tour = np.arange(n + 1)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n):
+            for j in range(i + 1, n + 1):
+                a, b, c = tour[i - 1], tour[i], tour[j]
+                d = tour[j + 1] if j < n else tour[0]
+                if D[a, c] + D[b, d] - D[a, b] - D[c, d] < -1e-9:
+                    tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+                    improved = True
+    
+    for k in range(n):
+        legs[k] = D[tour[k], tour[k + 1]]
+    return order[tour[1:] - 1]
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _total_distances(lats, lngs):
+    """Sum of distances from each point (radians) to all the others, without an m x m matrix"""
+    m = lats.shape[0]
+    cos_lats = np.cos(lats)
+    totals = np.empty(m)
+    for i in prange(m):
+        total = 0.0
+        for j in range(m):
+            total += _haversine_cos(lats[i], lngs[i], cos_lats[i], lats[j], lngs[j], cos_lats[j])
+        totals[i] = total
+    return totals
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _nn_routes(lats, lngs, offsets, start_lat, start_lng):
+    """_nn_route + _two_opt for every group at once; group g is rows offsets[g]:offsets[g+1], solved in parallel"""
+    order = np.empty(lats.shape[0], dtype=np.int64)
+    legs = np.empty(lats.shape[0])
+    cos_lats = np.cos(lats)
+    for g in prange(offsets.shape[0] - 1):
+        lo, hi = offsets[g], offsets[g + 1]
+        route = _nn_route(lats[lo:hi], lngs[lo:hi], cos_lats[lo:hi], start_lat, start_lng)
+        order[lo:hi] = _two_opt(route, lats[lo:hi], lngs[lo:hi], cos_lats[lo:hi], start_lat, start_lng, legs[lo:hi])
+    return order, legs
+
 def find_lat_lng_columns(df):
     """Find latitude and longitude columns with flexible naming"""
     lat_col = None
@@ -65,54 +193,61 @@ def find_lat_lng_columns(df):
     
     return lat_col, lng_col
 
-def nearest_neighbor_route(points, start_lat, start_lng):
+def optimize_all_routes(assignments, lat_col, lng_col, start_lat, start_lng):
     """
-    Optimize route using nearest neighbor algorithm
-    Returns ordered list of indices
+    Order every (salesperson, day) route by nearest neighbour, polished with 2-opt, in one parallel call.
+    Returns the assignments sorted by route with a 1-based 'visit_order' column and
+    'leg_km', the distance into each stop from the previous one (the office for stop 1).
     """
-    if len(points) == 0:
-        return []
-    
-    unvisited = list(range(len(points)))
-    route = []
-    current_lat, current_lng = start_lat, start_lng
-    
-    while unvisited:
-        # Find nearest unvisited point
-        min_dist = float('inf')
-        nearest_idx = None
-        
-        for idx in unvisited:
-            dist = haversine_distance(current_lat, current_lng, 
-                                     points[idx]['lat'], points[idx]['lng'])
-            if dist < min_dist:
-                min_dist = dist
-                nearest_idx = idx
-        
-        route.append(nearest_idx)
-        unvisited.remove(nearest_idx)
-        current_lat = points[nearest_idx]['lat']
-        current_lng = points[nearest_idx]['lng']
-    
-    return route
+    routes = assignments.sort_values(['salesperson_id', 'day_id'], kind='stable').reset_index(drop=True)
+    if len(routes) == 0:
+        return routes.assign(visit_order=pd.Series(dtype='int64'), leg_km=pd.Series(dtype='float64'))
+    
+    group_sizes = routes.groupby(['salesperson_id', 'day_id'], sort=False).size().to_numpy()
+    offsets = np.concatenate(([0], np.cumsum(group_sizes))).astype(np.int64)
+    order, legs = _nn_routes(
+        np.radians(routes[lat_col].to_numpy(dtype=float)), np.radians(routes[lng_col].to_numpy(dtype=float)),
+        offsets, np.radians(start_lat), np.radians(start_lng)
+    )
+    
+    # order holds, per group, which local row is visited at each step; invert it to ranks
+    group_start = np.repeat(offsets[:-1], group_sizes)
+    visit_order = np.empty(len(routes), dtype=np.int64)
+    visit_order[group_start + order] = np.arange(len(routes)) - group_start + 1
+    leg_km = np.empty(len(routes))
+    leg_km[group_start + order] = legs
+    routes['visit_order'] = visit_order
+    routes['leg_km'] = leg_km
+    return routes.sort_values(['salesperson_id', 'day_id', 'visit_order'], kind='stable').reset_index(drop=True)
 
 def kmedoids_clustering(X, n_clusters, max_iter=300):
     """
-    Simple K-Medoids implementation using PAM algorithm
+    K-Medoids on haversine distances using FasterPAM over a precomputed dissimilarity matrix.
+    Above PAM_MAX_POINTS that matrix gets too large, so the alternating update below is used.
+    """
+    if X.shape[0] > PAM_MAX_POINTS:
+        return alternating_kmedoids(X, n_clusters, max_iter)
+    
+    lat, lng = np.radians(np.asarray(X, dtype=np.float32)).T
+    D = pairwise_haversine(lat, lng)
+    result = kmedoids.fasterpam(D, n_clusters, max_iter=max_iter, random_state=42)
+    return np.asarray(result.labels)
+
+def alternating_kmedoids(X, n_clusters, max_iter=300):
+    """
+    Simple K-Medoids: assign to the nearest medoid, then move each medoid to its cluster's best point
     """
     n_samples = X.shape[0]
     
     # Initialize medoids randomly
     medoid_indices = np.random.choice(n_samples, n_clusters, replace=False)
+    # Converted once; every iteration below works in float32 radians (sub-metre at Earth scale)
+    Xr = np.radians(np.asarray(X, dtype=np.float32))
     
     for iteration in range(max_iter):
-        # Assign points to nearest medoid
-        distances = np.zeros((n_samples, n_clusters))
-        for i, medoid_idx in enumerate(medoid_indices):
-            for j in range(n_samples):
-                distances[j, i] = haversine_distance(
-                    X[j, 0], X[j, 1], X[medoid_idx, 0], X[medoid_idx, 1]
-                )
+        # Assign points to nearest medoid (n_samples x n_clusters distances in one call)
+        medoids = Xr[medoid_indices]
+        distances = _haversine_rad(Xr[:, 0:1], Xr[:, 1:2], medoids[:, 0], medoids[:, 1])
         
         labels = np.argmin(distances, axis=1)
         
@@ -124,19 +259,12 @@ def kmedoids_clustering(X, n_clusters, max_iter=300):
                 new_medoid_indices.append(medoid_indices[cluster_id])
                 continue
             
-            # Find point that minimizes total distance within cluster
-            min_cost = float('inf')
-            best_medoid = medoid_indices[cluster_id]
-            
-            for candidate in cluster_points:
-                cost = sum(haversine_distance(X[candidate, 0], X[candidate, 1], 
-                                             X[point, 0], X[point, 1]) 
-                          for point in cluster_points)
-                if cost < min_cost:
-                    min_cost = cost
-                    best_medoid = candidate
+            # Find point that minimizes total distance within cluster; accumulated per point,
+            # since this path exists for clusters too big for a full distance matrix
+            members = Xr[cluster_points]
+            costs = _total_distances(members[:, 0].astype(np.float64), members[:, 1].astype(np.float64))
             
-            new_medoid_indices.append(best_medoid)
+            new_medoid_indices.append(cluster_points[np.argmin(costs)])
         
         # Check for convergence
         if set(new_medoid_indices) == set(medoid_indices):
@@ -146,79 +274,84 @@ def kmedoids_clustering(X, n_clusters, max_iter=300):
     
     return labels
 
+@st.cache_data(show_spinner=False)
+def load_upload(file_id, name, _file):
+    """Read the uploaded CSV/Excel file; cached per upload so widget reruns don't re-parse it."""
+    _file.seek(0)
+    if name.endswith('.csv'):
+        return pd.read_csv(_file)
+    return pd.read_excel(_file)
+
 def perform_clustering(df, lat_col, lng_col, n_clusters, algorithm='kmeans'):
     """Perform clustering on geographic data"""
-    X = df[[lat_col, lng_col]].values
-    
+    return cluster_coordinates(df[[lat_col, lng_col]].to_numpy(), n_clusters, algorithm)
+
+@st.cache_data(show_spinner=False)
+def cluster_coordinates(X, n_clusters, algorithm):
+    """Cluster an (n, 2) lat/lng array; cached on the coordinates and parameters,
+    so regenerating with the same data and settings (e.g. a new office location) skips the clustering."""
     if algorithm == 'kmeans':
+        # float32 is plenty for coordinates and sklearn keeps it, halving KMeans' memory traffic
         model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        labels = model.fit_predict(X)
+        labels = model.fit_predict(X.astype(np.float32))
     elif algorithm == 'kmedoids':
         labels = kmedoids_clustering(X, n_clusters)
     elif algorithm == 'dbscan':
-        # For DBSCAN, eps in radians (approx 0.01 rad ≈ 1.1 km)
-        model = DBSCAN(eps=0.01, min_samples=5, metric='haversine')
+        # Haversine works on the unit sphere, so eps is a distance in radians: km / Earth's radius.
+        # The ball tree limits each neighbourhood query to nearby leaves instead of all n points.
+        model = DBSCAN(eps=DBSCAN_EPS_KM / 6371.0, min_samples=5, metric='haversine',
+                       algorithm='ball_tree', n_jobs=-1)
         X_rad = np.radians(X)
         labels = model.fit_predict(X_rad)
     else:
         model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        labels = model.fit_predict(X)
+        labels = model.fit_predict(X.astype(np.float32))
     
     return labels
 
 def assign_clusters_to_salespersons(df, labels, num_salespersons, num_days, leads_per_day):
     """Assign clusters to salespersons and days"""
-    df_copy = df.copy()
-    df_copy['cluster'] = labels
-    
-    # Get unique clusters
-    unique_clusters = df_copy['cluster'].unique()
-    n_clusters = len(unique_clusters)
-    
-    # Create assignment structure
-    assignments = []
-    cluster_idx = 0
-    
-    for person in range(num_salespersons):
-        for day in range(num_days):
-            if cluster_idx < n_clusters:
-                cluster_data = df_copy[df_copy['cluster'] == unique_clusters[cluster_idx]]
-                
-                # Limit to leads_per_day
-                if len(cluster_data) > leads_per_day:
-                    cluster_data = cluster_data.sample(n=leads_per_day, random_state=42)
-                
-                for idx, row in cluster_data.iterrows():
-                    assignments.append({
-                        'salesperson': f'Salesperson {person + 1}',
-                        'day': f'Day {day + 1}',
-                        'salesperson_id': person + 1,
-                        'day_id': day + 1,
-                        'original_index': idx,
-                        **row.to_dict()
-                    })
-                
-                cluster_idx += 1
-    
-    return pd.DataFrame(assignments)
+    # assign() leaves the caller's df untouched; on pandas 3 (copy-on-write) the new frame also shares
+    # df's column data, while pandas 2.x still copies it as df.copy() did
+    df_copy = df.assign(cluster=labels)
+    
+    # Get unique clusters; cluster k goes to salesperson k // num_days on day k % num_days
+    unique_clusters = df_copy['cluster'].unique()[:num_salespersons * num_days]
+    persons, days = np.unravel_index(np.arange(len(unique_clusters)), (num_salespersons, num_days))
+    
+    # Create assignment structure: tag each cluster's rows in one go, then concat once
+    parts = []
+    for cluster, person, day in zip(unique_clusters, persons, days):
+        cluster_data = df_copy[df_copy['cluster'] == cluster]
+        
+        # Limit to leads_per_day
+        if len(cluster_data) > leads_per_day:
+            cluster_data = cluster_data.sample(n=leads_per_day, random_state=42)
+        
+        parts.append(pd.concat([
+            pd.DataFrame({
+                'salesperson': f'Salesperson {person + 1}',
+                'day': f'Day {day + 1}',
+                'salesperson_id': person + 1,
+                'day_id': day + 1,
+                'original_index': cluster_data.index,
+            }, index=cluster_data.index),
+            cluster_data,
+        ], axis=1))
+    
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True)
 
 def calculate_route_distance(route_data, office_lat, office_lng, lat_col, lng_col):
-    """Calculate total route distance"""
+    """Calculate total route distance for one route from optimize_all_routes (in visit order)"""
     if len(route_data) == 0:
         return 0
     
-    total_dist = 0
-    current_lat, current_lng = office_lat, office_lng
-    
-    for _, row in route_data.iterrows():
-        dist = haversine_distance(current_lat, current_lng, row[lat_col], row[lng_col])
-        total_dist += dist
-        current_lat, current_lng = row[lat_col], row[lng_col]
-    
-    # Return to office
-    total_dist += haversine_distance(current_lat, current_lng, office_lat, office_lng)
-    
-    return total_dist
+    # Legs come from optimize_all_routes' distance matrices; only the drive back to the office is new
+    last = route_data.iloc[-1]
+    back = _haversine_scalar(*np.radians([last[lat_col], last[lng_col], office_lat, office_lng]))
+    return route_data['leg_km'].sum() + back
 
 def create_numbered_icon(number):
     """Create a custom numbered icon HTML"""
@@ -260,33 +393,36 @@ def create_route_map(route_data, office_lat, office_lng, lat_col, lng_col, sales
         icon=folium.Icon(color='red', icon='home', prefix='fa')
     ).add_to(m)
     
-    # Add route markers with numbers
-    route_coords = [[office_lat, office_lng]]
-    
-    for idx, row in route_data.iterrows():
-        visit_order = row['visit_order']
-        lat, lng = row[lat_col], row[lng_col]
-        
-        # Create popup with address info
-        popup_text = f"""
+    # Pull the columns out once instead of building a Series per row
+    lats = route_data[lat_col].to_numpy()
+    lngs = route_data[lng_col].to_numpy()
+    visit_orders = route_data['visit_order'].to_numpy()
+    n = len(route_data)
+    info = {col: route_data[col].to_numpy() if col in route_data else np.full(n, 'N/A')
+            for col in ('address', 'city', 'zip_code')}
+    
+    # Create popups with address info
+    popup_texts = [
+        f"""
         <b>Stop #{visit_order}</b><br>
-        <b>Address:</b> {row.get('address', 'N/A')}<br>
-        <b>City:</b> {row.get('city', 'N/A')}<br>
-        <b>Zip:</b> {row.get('zip_code', 'N/A')}
+        <b>Address:</b> {address}<br>
+        <b>City:</b> {city}<br>
+        <b>Zip:</b> {zip_code}
         """
-        
-        # Add numbered marker
+        for visit_order, address, city, zip_code in zip(visit_orders, info['address'], info['city'], info['zip_code'])
+    ]
+    
+    # Add route markers with numbers
+    for lat, lng, visit_order, popup_text in zip(lats, lngs, visit_orders, popup_texts):
         folium.Marker(
             [lat, lng],
             popup=folium.Popup(popup_text, max_width=250),
             tooltip=f"Stop #{visit_order}",
             icon=create_numbered_icon(visit_order)
         ).add_to(m)
-        
-        route_coords.append([lat, lng])
     
-    # Add return to office
-    route_coords.append([office_lat, office_lng])
+    # Office -> stops -> back to office
+    route_coords = [[office_lat, office_lng], *zip(lats.tolist(), lngs.tolist()), [office_lat, office_lng]]
     
     # Draw route line
     folium.PolyLine(
@@ -328,10 +464,7 @@ with st.sidebar:
 if uploaded_file is not None:
     try:
         # Load data
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file)
+        df = load_upload(uploaded_file.file_id, uploaded_file.name, uploaded_file)
         
         st.success(f"✅ File uploaded successfully! {len(df)} records loaded.")
         
@@ -362,6 +495,9 @@ if uploaded_file is not None:
                             df, labels, num_salespersons, num_days, leads_per_day
                         )
                         
+                        # Optimize every route up front, in parallel, so switching selections is instant
+                        assignments = optimize_all_routes(assignments, lat_col, lng_col, office_lat, office_lng)
+                        
                         # Store in session state
                         st.session_state.processed_data = df
                         st.session_state.assignments = assignments
@@ -417,18 +553,10 @@ if uploaded_file is not None:
                     route_data = assignments[
                         (assignments['salesperson'] == selected_person) & 
                         (assignments['day'] == selected_day)
-                    ].copy()
+                    ].reset_index(drop=True)
                     
                     if len(route_data) > 0:
-                        # Prepare points for route optimization
-                        points = [{'lat': row[lat_col], 'lng': row[lng_col]} for _, row in route_data.iterrows()]
-                        
-                        # Optimize route using nearest neighbor
-                        route_order = nearest_neighbor_route(points, office_lat, office_lng)
-                        
-                        # Reorder data according to optimized route
-                        route_data = route_data.iloc[route_order].reset_index(drop=True)
-                        route_data['visit_order'] = range(1, len(route_data) + 1)
+                        # Already in nearest-neighbour visit order (see optimize_all_routes)
                         
                         # Calculate total distance
                         total_distance = calculate_route_distance(route_data, office_lat, office_lng, lat_col, lng_col)
@@ -451,7 +579,7 @@ if uploaded_file is not None:
                         
                         # Display route details
                         st.subheader("📍 Route Details")
-                        display_cols = ['visit_order', 'address', 'city', 'zip_code', lat_col, lng_col]
+                        display_cols = ['visit_order', 'address', 'city', 'zip_code', 'leg_km', lat_col, lng_col]
                         display_cols = [col for col in display_cols if col in route_data.columns]
                         st.dataframe(route_data[display_cols], use_container_width=True)
                         
@@ -0,0 +1,54 @@
+"""Stream the rows of a workbook's first sheet; shared by the split scripts."""
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # optional: fall back to openpyxl's streaming reader
+    CalamineWorkbook = None
+
+
+def _cell(value):
+    # Match openpyxl's values: calamine reports blank cells as '', every number as a float
+    # and midnight datetimes as plain dates
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def sheet_rows(path):
+    """Yield the first sheet's rows as tuples of cell values, None for blank cells.
+
+    Reads with the Rust calamine parser when python-calamine is installed, otherwise
+    streams with openpyxl in read-only mode; both give the same values.
+    """
+    if CalamineWorkbook is None:
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
+        return
+    for row in CalamineWorkbook.from_path(str(path)).get_sheet_by_index(0).iter_rows():
+        yield tuple(_cell(value) for value in row)
+
+
+def without_trailing_blanks(rows):
+    """Pass rows through, dropping only the all-blank rows after the last row with data.
+
+    Blank rows inside the data are kept, as pd.read_excel keeps them (as NaN rows);
+    trailing ones are usually formatting left past the end of the sheet.
+    """
+    blanks = []
+    for row in rows:
+        if all(value is None for value in row):
+            blanks.append(row)
+            continue
+        yield from blanks
+        blanks.clear()
+        yield row
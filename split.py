@@ -1,25 +1,65 @@
-import pandas as pd
-import numpy as np
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import xlsxwriter
+
+from sheet_rows import sheet_rows, without_trailing_blanks
+
+# constant_memory flushes each row to disk as it is written, so a worker only holds the rows it was handed
+XLSX_OPTIONS = {
+    'constant_memory': True,
+    'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+    'strings_to_urls': False,
+}
 
-def split_excel_into_parts(input_file, output_folder, num_files=4):
-    # Read the Excel file
-    df = pd.read_excel(input_file)
 
+def _write_part(output_file, header, rows):
+    # Runs in a worker process: encoding the OOXML is the slow, CPU-bound part of the split
+    wb = xlsxwriter.Workbook(output_file, XLSX_OPTIONS)
+    ws = wb.add_worksheet()
+    for r, row in enumerate([header, *rows]):
+        ws.write_row(r, 0, row)
+    wb.close()
+    return output_file, len(rows)
 
 
+def _report(future):
+    output_file, part_size = future.result()
+    print(f"Saved: {output_file}  (rows: {part_size})")
+
+
+def split_excel_into_parts(input_file, output_folder, num_files=4):
+    # Stream the Excel file instead of loading it all into a DataFrame.
+    # First pass only counts rows so the parts can be sized like np.array_split.
+    rows = sheet_rows(input_file)
+    header = next(rows, ())
+    total_rows = sum(1 for _ in without_trailing_blanks(rows))
+
     # Create output folder if it doesn't exist
     os.makedirs(output_folder, exist_ok=True)
 
-    # Split dataframe into num_files parts (handles leftover rows automatically)
-    split_dfs = np.array_split(df, num_files)
+    # Split rows into num_files parts (the first total_rows % num_files parts get one extra row)
+    base, extra = divmod(total_rows, num_files)
+    part_sizes = [base + 1 if i < extra else base for i in range(num_files)]
 
-    # Save each part into a separate Excel file
-    for i, split_df in enumerate(split_dfs):
-        output_file = os.path.join(output_folder, f"split_part_{i+1}.xlsx")
-        split_df.to_excel(output_file, index=False)
+    # Read each part's rows in order and hand it to a worker, so the parts are written concurrently.
+    # At most max_workers parts are in flight: the oldest is awaited before the next one is read.
+    rows = sheet_rows(input_file)
+    next(rows, None)  # header
+    rows = without_trailing_blanks(rows)
+    max_workers = min(num_files, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = deque()
+        for i, part_size in enumerate(part_sizes):
+            if len(in_flight) == max_workers:
+                _report(in_flight.popleft())
+            output_file = os.path.join(output_folder, f"split_part_{i+1}.xlsx")
+            part_rows = [next(rows) for _ in range(part_size)]
+            in_flight.append(pool.submit(_write_part, output_file, header, part_rows))
 
-        print(f"Saved: {output_file}  (rows: {len(split_df)})")
+        while in_flight:
+            _report(in_flight.popleft())
 
     print("\n✅ Done! All rows were included and no data was skipped.")
 
@@ -27,7 +67,9 @@ def split_excel_into_parts(input_file, output_folder, num_files=4):
 # -------------------------------
 # Example Usage
 # -------------------------------
-input_excel = "Odoo Customer Clean parser.xlsx"      # <-- replace with your file name
-output_directory = "split_folders_odoo_customers"      # <-- replace with your folder name
+# The guard keeps worker processes (spawned on Windows/macOS) from re-running the split on import
+if __name__ == "__main__":
+    input_excel = "Odoo Customer Clean parser.xlsx"      # <-- replace with your file name
+    output_directory = "split_folders_odoo_customers"      # <-- replace with your folder name
 
-split_excel_into_parts(input_excel, output_directory, num_files=4)
+    split_excel_into_parts(input_excel, output_directory, num_files=4)
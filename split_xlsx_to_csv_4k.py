@@ -1,26 +1,45 @@
 from pathlib import Path
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from sheet_rows import sheet_rows, without_trailing_blanks
+
+
+def _write_chunk(output_file: Path, header: tuple, rows: list) -> None:
+    # Every column goes out as text (empty for blank cells); pyarrow's C++ writer does the encoding
+    names = ["" if name is None else str(name) for name in header]
+    columns = [
+        pa.array([None if value is None else str(value) for value in column], type=pa.string())
+        for column in zip(*rows)
+    ]
+    pacsv.write_csv(pa.Table.from_arrays(columns, names=names), str(output_file))
+    print(f"Saved: {output_file} (rows: {len(rows)})")
 
 
 def split_xlsx_to_csv_chunks(xlsx_path: Path, output_dir: Path, rows_per_file: int) -> None:
-    df = pd.read_excel(xlsx_path)
+    # Stream rows straight from the sheet; only one chunk is ever held in memory
+    rows = sheet_rows(xlsx_path)
+    header = next(rows, None)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    total_rows = len(df)
-    if total_rows == 0:
+    part_num = 0
+    chunk = []
+    for row in without_trailing_blanks(rows):
+        chunk.append(row)
+        if len(chunk) == rows_per_file:
+            part_num += 1
+            _write_chunk(output_dir / f"part_{part_num}.csv", header, chunk)
+            chunk = []
+    if chunk:
+        part_num += 1
+        _write_chunk(output_dir / f"part_{part_num}.csv", header, chunk)
+
+    if part_num == 0:
         print("No rows found. Nothing to split.")
         return
 
-    for start in range(0, total_rows, rows_per_file):
-        end = min(start + rows_per_file, total_rows)
-        chunk = df.iloc[start:end]
-        part_num = (start // rows_per_file) + 1
-        output_file = output_dir / f"part_{part_num}.csv"
-        chunk.to_csv(output_file, index=False)
-        print(f"Saved: {output_file} (rows: {len(chunk)})")
-
-    print(f"\nDone. Created {((total_rows - 1) // rows_per_file) + 1} file(s).")
+    print(f"\nDone. Created {part_num} file(s).")
 
 
 if __name__ == "__main__":